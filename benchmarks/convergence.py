@@ -0,0 +1,80 @@
+# /benchmarks/convergence.py
+"""
+Generations-to-target for each mutation step-size controller.
+
+Evolves a single node per seed until it reaches the target confidence (or the
+generation budget runs out) with every controller in utils.step_size, on the
+synthetic models of run_benchmarks. Reports the median generations to target,
+how many seeds got there, and the speed-up over "fixed". Results are JSON.
+
+    python -m benchmarks.convergence --output convergence.json
+    python -m benchmarks.convergence --shapes mnist --models SVM --seeds 3
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+from benchmarks.harness import make_parser, run_cases
+from benchmarks.run_benchmarks import SHAPES, apply_shape, train_synthetic_model
+from config import config
+from utils.step_size import STEP_SIZE_CONTROLLERS
+
+
+def generations_to_target(model, seed, max_generations):
+    """Generations one node needs to reach config.target_confidence, or None within max_generations."""
+    from core.candc import CommandAndControl
+    from core.node import Node
+
+    config.seed = seed
+    node = Node(cluster_id=0, local_node_id=0, model=model, target_class=0)
+    candc = CommandAndControl()
+    candc.assign_node(node)
+    while node.generation < max_generations and not candc.terminated:
+        node.evolve(round_num=0)
+    return candc.best_report[2] if candc.terminated else None
+
+
+def run_case(model_name, shape_name, seeds, max_generations):
+    apply_shape(shape_name)
+    config.dataset_name = f"bench_{shape_name}"
+    config.model_name = model_name
+    model = train_synthetic_model(model_name, shape_name)
+
+    result = {"model": model_name, "shape": shape_name, "controllers": {}}
+    for kind in STEP_SIZE_CONTROLLERS:
+        config.step_size_control = kind
+        generations = [generations_to_target(model, seed, max_generations) for seed in range(seeds)]
+        # Runs that miss the target count as the full budget
+        budget = [max_generations if g is None else g for g in generations]
+        result["controllers"][kind] = {
+            "generations": generations,
+            "reached": sum(g is not None for g in generations),
+            "median_generations": float(np.median(budget)),
+        }
+
+    fixed = result["controllers"]["fixed"]["median_generations"]
+    for stats in result["controllers"].values():
+        stats["speedup_vs_fixed"] = fixed / stats["median_generations"]
+    return result
+
+
+def main():
+    parser = make_parser(__doc__, SHAPES, models=["SVM", "MLP"])
+    parser.add_argument("--seeds", type=int, default=5)
+    parser.add_argument("--max-generations", type=int, default=5000)
+    parser.add_argument("--target", type=float, default=0.9, help="target confidence")
+    args = parser.parse_args()
+
+    config.target_confidence = args.target
+    config.max_generations = 100
+    config.headless = True
+    config.snapshot_interval = 0
+    run_cases(
+        args, lambda model_name, shape_name: run_case(model_name, shape_name, args.seeds, args.max_generations),
+        target_confidence=args.target,
+    )
+
+
+if __name__ == "__main__":
+    main()
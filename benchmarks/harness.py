@@ -0,0 +1,78 @@
+# /benchmarks/harness.py
+"""Command line and JSON reporting shared by the benchmark scripts."""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import warnings
+
+import numpy as np
+import sklearn
+from utils.artifacts import close_artifact_writer
+
+MODELS = ["SVM", "RF", "MLP"]
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), stderr=subprocess.DEVNULL, text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def make_parser(description, shapes, models=MODELS):
+    """Parser with the --shapes, --models and --output options every benchmark takes; add your own to it."""
+    parser = argparse.ArgumentParser(description=description, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--shapes", nargs="+", default=list(shapes), choices=list(shapes))
+    parser.add_argument("--models", nargs="+", default=list(models), choices=MODELS)
+    parser.add_argument("--output", help="also write the JSON report to this file")
+    return parser
+
+
+def run_cases(args, run_case, **report_fields):
+    """
+    Call run_case(model_name, shape_name) for every requested shape and model
+    and report the results as JSON, printed and written to args.output.
+
+    Cases run in a scratch directory, since simulations write results/ and
+    topology.png, with their stdout silenced; progress goes to stderr.
+    """
+    warnings.filterwarnings("ignore")
+    report = {
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "sklearn": sklearn.__version__,
+        **report_fields,
+        "results": [],
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            for shape_name in args.shapes:
+                for model_name in args.models:
+                    print(f"⏱️ {model_name} on {shape_name}...", file=sys.stderr)
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        report["results"].append(run_case(model_name, shape_name))
+        finally:
+            # Buffered snapshots belong to the scratch directory; write them before it goes
+            close_artifact_writer()
+            os.chdir(cwd)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    return report
@@ -0,0 +1,144 @@
+# /benchmarks/run_benchmarks.py
+"""
+Throughput benchmarks for the evolution hot paths.
+
+Measures evaluations/sec, mutants/sec, generations/sec and rounds/sec on
+digits (8x8) and MNIST (28x28) shapes, with SVM/RF/MLP models trained on
+synthetic data so no download is needed. Results are printed as JSON.
+
+    python -m benchmarks.run_benchmarks --output bench.json
+    python -m benchmarks.run_benchmarks --shapes digits --models SVM --quick
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+import numpy as np
+from benchmarks.harness import make_parser, run_cases
+from config import config
+from models.train_model import create_model
+
+SHAPES = {
+    "digits": {"image_height": 8, "image_width": 8, "pixel_max": 16},
+    "mnist": {"image_height": 28, "image_width": 28, "pixel_max": 255},
+}
+
+
+def make_synthetic_dataset(height, width, pixel_max, n_classes=10, samples_per_class=60, seed=0):
+    """Noisy copies of one random prototype image per class, as integer pixels."""
+    rng = np.random.RandomState(seed)
+    prototypes = rng.randint(0, pixel_max + 1, size=(n_classes, height * width))
+    noise = rng.normal(0, pixel_max * 0.15, size=(n_classes, samples_per_class, height * width))
+    X = np.clip(prototypes[:, None, :] + noise, 0, pixel_max).round().reshape(-1, height * width)
+    y = np.repeat(np.arange(n_classes), samples_per_class)
+    return X, y
+
+
+def train_synthetic_model(model_name, shape_name):
+    shape = SHAPES[shape_name]
+    X, y = make_synthetic_dataset(shape["image_height"], shape["image_width"], shape["pixel_max"])
+    model = create_model(model_name)
+    model.fit(X, y)
+    return model
+
+
+def measure_rate(fn, units_per_call=1, min_time=0.5, min_calls=3):
+    """Call fn repeatedly for at least min_time seconds; returns units per second."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time and calls >= min_calls:
+            return calls * units_per_call / elapsed
+
+
+def apply_shape(shape_name):
+    for key, value in SHAPES[shape_name].items():
+        setattr(config, key, value)
+
+
+def bench_evaluation(model, shape_name, min_time, batch_size=64):
+    from utils.evaluation import evaluate_fitness, evaluate_batch
+
+    rng = np.random.RandomState(0)
+    shape = SHAPES[shape_name]
+    images = rng.randint(0, shape["pixel_max"] + 1, (batch_size, shape["image_height"], shape["image_width"]))
+    return {
+        "evaluate_fitness_per_sec": measure_rate(lambda: evaluate_fitness(images[0], model, 0), 1, min_time),
+        f"evaluate_batch{batch_size}_images_per_sec": measure_rate(
+            lambda: evaluate_batch(images, model, 0), batch_size, min_time
+        ),
+    }
+
+
+def bench_mutation(shape_name, min_time, batch_size=64):
+    from utils.mutation import mutate, mutate_batch
+
+    rng = np.random.RandomState(0)
+    shape = SHAPES[shape_name]
+    images = rng.randint(0, shape["pixel_max"] + 1, (batch_size, shape["image_height"], shape["image_width"]))
+    out = np.empty_like(images)
+    return {
+        "mutate_per_sec": measure_rate(lambda: mutate(images[0], config.mutation_rate), 1, min_time),
+        f"mutate_batch{batch_size}_mutants_per_sec": measure_rate(
+            lambda: mutate_batch(images, config.mutation_rate, out=out), batch_size, min_time
+        ),
+    }
+
+
+def bench_node(model, min_time, generations=50):
+    from core.node import Node
+
+    node = Node(cluster_id=0, local_node_id=0, model=model, target_class=0)
+    return {"node_generations_per_sec": measure_rate(lambda: node.evolve(round_num=0), generations, min_time)}
+
+
+def bench_simulation(model, rounds=2):
+    from simulation.run_simulation import run_simulation
+
+    config.max_rounds = rounds
+    start = time.perf_counter()
+    run_simulation(model, 0)
+    return {"simulation_rounds_per_sec": rounds / (time.perf_counter() - start)}
+
+
+def run_case(model_name, shape_name, quick):
+    min_time = 0.2 if quick else 1.0
+    apply_shape(shape_name)
+    # Small system, unreachable target: every run does a fixed amount of work
+    config.target_confidence = 1.1
+    config.max_generations = 20 if quick else 50
+    config.clusters = 2
+    config.nodes_per_cluster = 4 if quick else 10
+    config.seed = 0
+    config.checkpoint_interval = 0
+    # Rounds/sec should time the rounds, not matplotlib, plotting or the topology export
+    config.headless = True
+    config.export_topology = False
+    config.dataset_name = f"bench_{shape_name}"
+    config.model_name = model_name
+
+    start = time.perf_counter()
+    model = train_synthetic_model(model_name, shape_name)
+    result = {"model": model_name, "shape": shape_name, "train_seconds": time.perf_counter() - start}
+
+    result.update(bench_evaluation(model, shape_name, min_time))
+    result.update(bench_mutation(shape_name, min_time))
+    result.update(bench_node(model, min_time, config.max_generations))
+    result.update(bench_simulation(model, rounds=1 if quick else 2))
+    return result
+
+
+def main():
+    parser = make_parser(__doc__, SHAPES)
+    parser.add_argument("--quick", action="store_true", help="shorter timings and a smaller system")
+    args = parser.parse_args()
+    run_cases(args, lambda model_name, shape_name: run_case(model_name, shape_name, args.quick))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+# /benchmarks/scheduler.py
+"""
+Time-to-target of each round scheduler against the uniform baseline.
+
+Runs the round-based simulation once per seed with every scheduler in
+simulation.scheduler on the synthetic models of run_benchmarks, until the
+target confidence is reached or max_rounds runs out. Reports wall-clock
+seconds and generations summed over all nodes, plus the speed-up
+over "uniform". Results are JSON.
+
+    python -m benchmarks.scheduler --output scheduler.json
+    python -m benchmarks.scheduler --shapes mnist --models MLP --seeds 3
+"""
+
+import sys, os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import time
+
+import numpy as np
+from benchmarks.harness import make_parser, run_cases
+from benchmarks.run_benchmarks import SHAPES, apply_shape, train_synthetic_model
+from config import config
+from simulation.scheduler import SCHEDULERS
+
+
+def time_to_target(model, seed):
+    from simulation.run_simulation import run_simulation
+
+    config.seed = seed
+    start = time.perf_counter()
+    clusters = run_simulation(model, 0)
+    seconds = time.perf_counter() - start
+    nodes = [node for _, nodes in clusters for node in nodes]
+    return {
+        "reached": nodes[0].candc.terminated,
+        "seconds": seconds,
+        "generations": sum(node.generation for node in nodes),
+    }
+
+
+def run_case(model_name, shape_name, seeds):
+    apply_shape(shape_name)
+    config.dataset_name = f"bench_{shape_name}"
+    config.model_name = model_name
+    model = train_synthetic_model(model_name, shape_name)
+
+    result = {"model": model_name, "shape": shape_name, "schedulers": {}}
+    for kind in SCHEDULERS:
+        config.scheduler = kind
+        runs = [time_to_target(model, seed) for seed in range(seeds)]
+        result["schedulers"][kind] = {
+            "runs": runs,
+            "reached": sum(run["reached"] for run in runs),
+            "median_seconds": float(np.median([run["seconds"] for run in runs])),
+            "median_generations": float(np.median([run["generations"] for run in runs])),
+        }
+
+    baseline = result["schedulers"]["uniform"]
+    for stats in result["schedulers"].values():
+        stats["speedup_seconds"] = baseline["median_seconds"] / stats["median_seconds"]
+        stats["speedup_generations"] = baseline["median_generations"] / stats["median_generations"]
+    return result
+
+
+def main():
+    parser = make_parser(__doc__, SHAPES, models=["SVM", "MLP"])
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--target", type=float, default=0.9, help="target confidence")
+    parser.add_argument("--max-rounds", type=int, default=50)
+    args = parser.parse_args()
+
+    config.target_confidence = args.target
+    config.max_rounds = args.max_rounds
+    config.clusters = 2
+    config.nodes_per_cluster = 8
+    config.max_generations = 50
+    config.checkpoint_interval = 0
+    config.export_topology = False
+    config.headless = True
+    run_cases(args, lambda model_name, shape_name: run_case(model_name, shape_name, args.seeds),
+              target_confidence=args.target)
+
+
+if __name__ == "__main__":
+    main()
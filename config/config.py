@@ -4,25 +4,80 @@
 clusters = 1
 nodes_per_cluster = 30
 neighbors_per_node = 3
+node_topology = "random"      # within a cluster: "random", "ring", "k_regular" or "small_world"
+supernode_topology = "full"   # between supernodes: "full", "ring" or "tree"
+supernode_branching = 2       # children per supernode in the "tree" topology
+rewire_probability = 0.1      # small_world: chance each ring link is rewired to a random node
+num_workers = 1           # >1 runs the nodes of a round on a process pool
+shared_memory = True      # pool workers map the model and neighbors' best solutions from shared memory
+inference_server = False  # pool workers and island threads score on one dynamic-batching server (core.inference_server); probabilities only, so not with margin fitness or incremental evaluation
+inference_max_batch = 256       # images per coalesced batch
+inference_max_latency = 0.002   # seconds the oldest queued request may wait for a batch to fill
+seed = None               # set an int for reproducible runs
 
 # Evolution parameters
-# population_size = 50
+population_size = 1       # K candidates held per node (1 = classic (1+1) hill climber)
+offspring_size = 1        # λ mutants generated per generation
+selection = "plus"        # "plus" for (μ+λ), or "tournament"
+tournament_size = 2
 mutation_rate = 0.5
+mutation_allow_repeats = True   # same pixel may be hit more than once per mutant (original behaviour)
+mutation_max_delta = 1          # mutants add a random delta in [-max_delta, max_delta] to each hit pixel
+step_size_control = "fixed"     # per-node mutation strength: "fixed", "one_fifth" or "success_rule" (utils.step_size)
+step_size_window = 10           # one_fifth: generations between adjustments
+step_size_factor = 1.5          # one_fifth: how much to widen/narrow at each adjustment
+step_size_damping = 4.0         # success_rule: larger adapts more slowly
+step_size_restart = 0           # adaptive controllers: reset the strength after this many generations without progress (0 = never)
 max_generations = 100
+campaign_targets = None    # list of target classes, or "all": attack them together with shared inference (main.py)
+scheduler = "uniform"          # per-round generation budget: "uniform", or "halving" to favour improving nodes (simulation.scheduler)
+scheduler_min_generations = 10  # halving: generations every node still gets per round
+scheduler_smoothing = 0.5       # halving: weight of the last round in a node's improvement rate
+scheduler_reseed_rounds = 3     # halving: rounds in the bottom half before a node restarts from its cluster's best (0 = never)
+max_rounds = None         # stop after this many rounds even if the target wasn't reached (None = no limit)
 target_confidence = 0.995
+fitness_cache_size = 4096       # LRU entries of (image, model, target) -> confidence
+fitness_mode = "probability"    # or "margin": rank SVC candidates by target-class margin (exact probability still decides termination)
+svm_fast_path = True            # score fitted SVCs with the vectorized evaluator in utils.svm_fast
+svm_fast_min_batch = 16         # smaller probability batches go through predict_proba
+incremental_evaluation = False  # SVC/MLP: update each mutant's model intermediates from its changed pixels only
+
+# Surrogate prefiltering (rank many mutants cheaply, score only the best with the real model)
+surrogate_enabled = False
+surrogate_pool_size = 32        # mutants generated per generation; the best offspring_size are scored
+surrogate_warmup = 256          # real scores collected before the surrogate starts filtering
+surrogate_refit_interval = 128  # new samples between refits
+surrogate_ridge = 1.0
+surrogate_audit_interval = 20   # every N generations score the whole pool to measure surrogate accuracy
 
 # Communication parameters
 buffer_size = 10
 communication_interval = 5
 supernode_sync_interval = 1
+execution_mode = "rounds"   # "rounds" (lockstep) or "islands" (asynchronous message passing)
+transport = "local"         # island transport: "local" (in-process) or "socket" (localhost TCP)
+relay_interval = 0.1        # seconds between supernode relays in island mode
+island_processes = 0        # islands: split the clusters over this many processes (socket transport); 0 = threads only
+
+# Artifacts
+snapshot_interval = 5       # record the best mutant every N generations (0 = only on success)
+snapshot_chunk_size = 1024  # snapshots buffered per round before a .npz chunk is written
+render_png = False          # render PNGs from the snapshot store when the run ends
+headless = False            # compute-only: never import matplotlib (data files are still written, plots are skipped)
+profile = False             # per-round / per-node phase timings and counters -> profile.json
+history_buffer_size = 4096  # float32 confidences kept in RAM per node before spilling to disk
+export_topology = True      # write edge list, GraphML and a plot of the topology on a background thread
+topology_plot_max_nodes = 200  # larger topologies are plotted as a cluster-level summary
 
 # Fault tolerance
+checkpoint_interval = 1     # rounds between checkpoints (0 = off); only changed nodes are rewritten
 failure_rate = 0.02
 recovery_time = 3
 
 # Dataset & Model Info
 dataset_name = "fashion_mnist"  # or #"digits", "mnist", "fashion_mnist", etc.
 model_name = "SVM"
+model_mmap = True   # memory-map model arrays on load (copy-on-write) instead of reading them into RAM
 
 # After training, these will be set automatically
 model_file = None
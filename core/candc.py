@@ -1,19 +1,46 @@
 # /core/candc.py
-from utils.evaluation import evaluate_fitness
+import threading
 from config import config
+from utils.profiling import get_profiler
 
 
 class CommandAndControl:
-    def __init__(self):
+    """
+    Event-driven coordinator: nodes report improvements as they happen and
+    C&C keeps the global best, so termination is an O(1) check.
+
+    `cancel_event` is the cooperative stop signal that running node evolutions
+    poll every generation; pass a multiprocessing.Event to share it with workers.
+    """
+
+    def __init__(self, cancel_event=None):
         self.nodes = []
         self.terminated = False
+        self.best_fitness = 0.0
+        self.best_report = None  # (node_id, fitness, generation)
+        self.cancel_event = cancel_event if cancel_event is not None else threading.Event()
+        self.lock = threading.Lock()
     
     def assign_node(self, node):
         self.nodes.append(node)
+        node.candc = self
+        if node.best_solution is not None:
+            self.report(node.global_id, node.best_confidence, node.best_generation)
+
+    def report(self, node_id, fitness, generation):
+        with self.lock:
+            if fitness > self.best_fitness:
+                self.best_fitness = fitness
+                self.best_report = (node_id, fitness, generation)
+
+            if fitness >= config.target_confidence and not self.terminated:
+                self.terminated = True
+                self.cancel_event.set()
+                print(f"Termination condition met by {node_id} at generation {generation}. System stopping.")
+
+    def should_stop(self):
+        return self.terminated or self.cancel_event.is_set()
     
     def check_termination(self):
-        for node in self.nodes:
-            if node.best_solution is not None and evaluate_fitness(node.best_solution, node.model, node.target_class) >= config.target_confidence:
-                self.terminated = True
-                print("Termination condition met. System stopping.")
-                return self.terminated
+        get_profiler().count("termination_checks")
+        return self.terminated
@@ -0,0 +1,260 @@
+# /core/inference_server.py
+import queue
+import threading
+import time
+from collections import deque
+
+import numpy as np
+from config import config
+from core.transport import RequestClient, RequestServer
+from utils.evaluation import evaluate_all_classes
+
+
+class _Request:
+    """One caller's batch waiting for its share of a coalesced prediction."""
+
+    def __init__(self, images):
+        self.images = images
+        self.enqueued = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+    def wait(self):
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class InferenceMetrics:
+    """Throughput and queue-latency counters of an InferenceServer."""
+
+    def __init__(self, latency_samples=10000):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.images = 0
+        self.batches = 0
+        self.busy_seconds = 0.0
+        self.queue_waits = deque(maxlen=latency_samples)  # most recent per-request waits, in seconds
+        self.lock = threading.Lock()
+
+    def record(self, batch, batch_start, batch_end):
+        with self.lock:
+            self.batches += 1
+            self.requests += len(batch)
+            self.images += sum(len(request.images) for request in batch)
+            self.busy_seconds += batch_end - batch_start
+            self.queue_waits.extend(batch_start - request.enqueued for request in batch)
+
+    def stats(self):
+        with self.lock:
+            waits = np.array(self.queue_waits) * 1000.0
+            elapsed = time.perf_counter() - self.started
+            return {
+                "requests": self.requests,
+                "images": self.images,
+                "batches": self.batches,
+                "mean_batch_size": self.images / self.batches if self.batches else 0.0,
+                "images_per_sec": self.images / elapsed if elapsed > 0 else 0.0,
+                "model_images_per_sec": self.images / self.busy_seconds if self.busy_seconds > 0 else 0.0,
+                "utilization": self.busy_seconds / elapsed if elapsed > 0 else 0.0,
+                "queue_latency_ms": {
+                    "mean": float(waits.mean()) if waits.size else 0.0,
+                    "p50": float(np.percentile(waits, 50)) if waits.size else 0.0,
+                    "p95": float(np.percentile(waits, 95)) if waits.size else 0.0,
+                    "max": float(waits.max()) if waits.size else 0.0,
+                },
+            }
+
+
+def _check_config():
+    """
+    Clients only ever see the server's probabilities, so options that need the
+    model itself in the node's process would silently fall back; refuse them.
+    """
+    conflicts = []
+    if config.fitness_mode == "margin":
+        conflicts.append('fitness_mode="margin"')
+    if config.incremental_evaluation:
+        conflicts.append("incremental_evaluation")
+    if conflicts:
+        raise ValueError(
+            f"inference_server can't be combined with {' or '.join(conflicts)}: nodes behind the server "
+            "get probabilities only (the server still uses the SVC fast path for them)"
+        )
+
+
+class InferenceServer:
+    """
+    Owns the model and scores requests from many nodes in coalesced batches.
+
+    Callers in this process submit through a queue (InferenceClient); other
+    processes connect over an authenticated localhost socket
+    (SocketInferenceClient; the authkey defaults to the multiprocessing one,
+    which child processes inherit). One
+    batcher thread takes the oldest request, then keeps collecting until the
+    batch holds max_batch_size images or the oldest request has waited
+    max_latency seconds, and runs a single prediction for all of them. When
+    the number of callers is known (`callers`, e.g. the pool size), a batch
+    holding a request from each is closed at once: nobody is left to wait for.
+    Large coalesced batches also let SVCs take the vectorized fast path.
+
+    Margin fitness and incremental evaluation need the model in the node's
+    process, so they raise a ValueError here rather than silently turning off.
+    """
+
+    def __init__(self, model, max_batch_size=None, max_latency=None, callers=None, host="127.0.0.1", port=0,
+                 authkey=None):
+        _check_config()
+        self.model = model
+        self.callers = callers
+        self.max_batch_size = max_batch_size or config.inference_max_batch
+        self.max_latency = config.inference_max_latency if max_latency is None else max_latency
+        self.metrics = InferenceMetrics()
+        self.requests = queue.Queue()
+
+        self.batcher = threading.Thread(target=self._run_batcher, name="inference-batcher", daemon=True)
+        self.batcher.start()
+        self.server = RequestServer(self._handle, host, port, authkey, name="inference-server")
+        self.address = self.server.address
+        self.authkey = self.server.authkey
+
+    def _handle(self, request):
+        op = request[0]
+        if op == "predict_proba":
+            return self.predict_proba(request[1])
+        elif op == "describe":
+            return self.describe()
+        elif op == "stats":
+            return self.metrics.stats()
+        raise ValueError(f"unknown op {op!r}")
+
+    def describe(self):
+        """What a client needs to stand in for the model."""
+        classes = getattr(self.model, "classes_", None)
+        return {
+            "classes": None if classes is None else np.asarray(classes),
+            "n_features": getattr(self.model, "n_features_in_", None),
+        }
+
+    def predict_proba(self, images):
+        """Class probabilities for `images`, scored together with whatever else is queued."""
+        request = _Request(np.asarray(images))
+        self.requests.put(request)
+        return request.wait()
+
+    def _collect(self, first):
+        batch = [first]
+        size = len(first.images)
+        deadline = first.enqueued + self.max_latency
+        while size < self.max_batch_size and len(batch) != self.callers:
+            timeout = deadline - time.perf_counter()
+            try:
+                # Past the deadline, still take whatever is already queued
+                request = self.requests.get(timeout=timeout) if timeout > 0 else self.requests.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self.requests.put(None)  # stop after this batch
+                break
+            batch.append(request)
+            size += len(request.images)
+        return batch
+
+    def _run_batcher(self):
+        while True:
+            first = self.requests.get()
+            if first is None:
+                return
+            batch = self._collect(first)
+
+            start = time.perf_counter()
+            try:
+                probabilities = evaluate_all_classes(np.concatenate([r.images for r in batch]), self.model)
+            except Exception as exc:
+                for request in batch:
+                    request.error = exc
+                    request.done.set()
+                continue
+            self.metrics.record(batch, start, time.perf_counter())
+
+            offset = 0
+            for request in batch:
+                request.result = probabilities[offset:offset + len(request.images)]
+                offset += len(request.images)
+                request.done.set()
+
+    def client(self):
+        """Model stand-in for callers in this process."""
+        return InferenceClient(self)
+
+    def summary(self):
+        stats = self.metrics.stats()
+        latency = stats["queue_latency_ms"]
+        return (
+            f"🧠 Inference server: {stats['images']} images in {stats['batches']} batches "
+            f"({stats['mean_batch_size']:.1f} per batch, {stats['images_per_sec']:.0f} images/s, "
+            f"utilization {stats['utilization']:.0%}); queue latency p50 {latency['p50']:.2f} ms, "
+            f"p95 {latency['p95']:.2f} ms"
+        )
+
+    def close(self):
+        self.requests.put(None)
+        self.batcher.join()
+        self.server.close()
+
+
+class _ModelProxy:
+    """
+    Stands in for the fitted classifier: predict_proba/predict are answered by
+    an InferenceServer, so evaluate_batch and evaluate_fitness work unchanged.
+    Pixels are sent as they are; the server converts them to features.
+    """
+
+    takes_raw_pixels = True
+
+    def _describe(self, description):
+        self.classes_ = description["classes"]
+        if description["n_features"] is not None:
+            self.n_features_in_ = description["n_features"]
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+
+class InferenceClient(_ModelProxy):
+    """In-process client: requests go straight onto the server's queue."""
+
+    def __init__(self, server):
+        self.server = server
+        self._describe(server.describe())
+
+    def predict_proba(self, X):
+        return self.server.predict_proba(X)
+
+    def stats(self):
+        return self.server.metrics.stats()
+
+    def close(self):
+        pass
+
+
+class SocketInferenceClient(_ModelProxy):
+    """Client for another process, talking to the server over its localhost socket."""
+
+    def __init__(self, address, authkey=None):
+        self.client = RequestClient(address, authkey)
+        self._describe(self.client.call("describe"))
+
+    def predict_proba(self, X):
+        try:
+            return self.client.call("predict_proba", np.asarray(X))
+        except RuntimeError as exc:
+            raise RuntimeError(f"Inference server failed: {exc}") from None
+
+    def stats(self):
+        return self.client.call("stats")
+
+    def close(self):
+        self.client.close()
@@ -1,17 +1,23 @@
 # /core/node.py
 import numpy as np
-import matplotlib.pyplot as plt
-import os
-from utils.mutation import mutate
-from utils.evaluation import evaluate_fitness
+from core.transport import Migrant
+from utils.artifacts import get_artifact_writer
+from utils.mutation import mutate_batch, pixel_dtype
+from utils.evaluation import FeatureBuffer, evaluate_batch, float_features, scores_are_probabilities
+from utils.fitness_cache import get_fitness_cache
+from utils.history import node_history
+from utils.incremental import get_incremental_model
+from utils.profiling import get_profiler
+from utils.surrogate import get_surrogate
+from utils.selection import survivor_indices
+from utils.step_size import make_step_size
 from config import config
-from config.paths import get_experiment_root
 
 class Node:
-    def __init__(self, cluster_id, local_node_id, model, target_class):
+    def __init__(self, cluster_id, local_node_id, model, target_class, id_prefix=""):
         self.cluster_id = cluster_id
         self.local_node_id = local_node_id
-        self.global_id = f"C{cluster_id}-N{local_node_id}"
+        self.global_id = f"{id_prefix}C{cluster_id}-N{local_node_id}"
 
         self.model = model
         self.target_class = target_class
@@ -20,94 +26,334 @@ class Node:
         self.image_width = config.image_width
         self.pixel_max = config.pixel_max
 
+        self.rng = np.random.RandomState(self.node_seed())
         self.population = self.initialize_population()
+        # Float scratch for the model's feature layout, reused every generation
+        self.features = FeatureBuffer()
+        self.parent_features = FeatureBuffer()
+        # Scored like offspring (evaluate_offspring), so selection compares one scale from generation 0
+        self.fitness = evaluate_batch(
+            self.population, self.model, self.target_class, mode=config.fitness_mode, buffer=self.features
+        )
+        # With the surrogate on, a larger pool of mutants is screened down to offspring_size
+        pool_size = config.surrogate_pool_size if config.surrogate_enabled else config.offspring_size
+        self.offspring = np.empty((pool_size,) + self.population.shape[1:], dtype=self.population.dtype)
+        self.step_size = make_step_size(self.population[0].size, self.pixel_max)
+        self.selection_buffers = {}  # reused (μ+λ) pools and survivor buffers, see gather_survivors()
         self.buffer = []
+        self.transport = None
+        self.candc = None
+        self.generation = 0  # generations run across all rounds
+        self.dirty = True    # state changed since the last checkpoint
         self.best_solution = None
-        self.best_fitness = 0.0
-        self.confidence_progress = []
+        self.best_generation = 0    # generation at which best_solution was found
+        self.best_fitness = 0.0     # selection score (a probability unless fitness_mode is "margin")
+        self.best_confidence = 0.0  # exact target-class probability of best_solution
+        # Delta-aware scoring: per-member model intermediates, rebuilt at the start of each round
+        self.incremental = get_incremental_model(model) if config.incremental_evaluation else None
+        self.intermediates = None
+        self.confidence_progress = node_history(self.global_id)
+        self.round_start = 0  # history index where the current round began
+
+    def node_seed(self):
+        """Per-node seed derived from config.seed, so runs don't depend on scheduling order."""
+        if config.seed is None:
+            return None
+        seed_seq = np.random.SeedSequence([config.seed, self.cluster_id, self.local_node_id])
+        return int(seed_seq.generate_state(1)[0])
 
     def initialize_population(self):
-        shape = (config.image_height, config.image_width)
-        return np.random.randint(0, config.pixel_max + 1, shape)
+        """K random candidates stored as one contiguous (K, H, W) array of the narrowest pixel dtype."""
+        shape = (config.population_size, config.image_height, config.image_width)
+        # Drawn as int64 and narrowed, so seeded runs keep their random stream
+        return self.rng.randint(0, config.pixel_max + 1, shape).astype(pixel_dtype(config.pixel_max))
 
+    def get_state(self):
+        """Evolution state needed to run this node elsewhere (e.g. in a worker process)."""
+        return {
+            "population": self.population,
+            "fitness": self.fitness,
+            "best_solution": self.best_solution,
+            "best_fitness": self.best_fitness,
+            "best_confidence": self.best_confidence,
+            "best_generation": self.best_generation,
+            "generation": self.generation,
+            "rng_state": self.rng.get_state(),
+            "step_size": self.step_size.get_state(),
+        }
 
-    def save_image(self, image, gen, confidence, round_num=None):
-        """Save the evolved image with round-specific folder."""
-        base_dir = get_experiment_root()  # e.g., results/mnist_SVM
-        if round_num is not None:
-            output_dir = os.path.join(base_dir, f"R{round_num}", self.global_id)
-        else:
-            output_dir = os.path.join(base_dir, self.global_id)
+    def set_state(self, state):
+        # Checkpoints written before pixels were narrowed hold int64 images
+        self.population = np.asarray(state["population"], dtype=self.offspring.dtype)
+        self.fitness = state["fitness"]
+        self.best_solution = state["best_solution"]
+        if self.best_solution is not None:
+            self.best_solution = np.asarray(self.best_solution, dtype=self.offspring.dtype)
+        self.best_fitness = state["best_fitness"]
+        self.best_confidence = state["best_confidence"]
+        self.generation = state["generation"]
+        # Checkpoints from before this was kept only know the node's generation
+        self.best_generation = state.get("best_generation")
+        if self.best_generation is None:
+            self.best_generation = self.generation
+        self.rng.set_state(state["rng_state"])
+        if state.get("step_size") is not None:
+            self.step_size.set_state(state["step_size"])
+        self.intermediates = None
+        self.dirty = True
 
-        os.makedirs(output_dir, exist_ok=True)
-        filename = f"{self.global_id}_gen_{gen}.png"
+    def adopt(self, solution, fitness):
+        """Replace the weakest population member with an incoming solution."""
+        worst = np.argmin(self.fitness)
+        self.population[worst] = solution
+        self.fitness[worst] = fitness
+        if self.intermediates is not None:
+            self.intermediates[worst] = self.incremental.initial(float_features(solution[np.newaxis]))[0]
+        self.dirty = True
 
-        plt.imshow(image, cmap='gray')
-        plt.title(f"{self.global_id} - Gen {gen} - Conf: {confidence:.4f}")
-        plt.axis('off')
-        plt.savefig(os.path.join(output_dir, filename))
-        plt.close()
+        if fitness > self.best_fitness:
+            self.record_best(solution, fitness)
 
-    def plot_confidence_progress(self, round_num=None):
-        """Plot confidence over generations with proper experiment path."""
-        base_dir = get_experiment_root()
-        if round_num is not None:
-            output_dir = os.path.join(base_dir, f"R{round_num}", self.global_id)
+    def reseed(self, solution, fitness):
+        """Restart the whole population from one solution (e.g. the cluster's best); RNG and step size carry on."""
+        self.population[:] = solution
+        self.fitness[:] = fitness
+        self.intermediates = None  # rebuilt by the next begin_round()
+        self.dirty = True
+
+        if fitness > self.best_fitness:
+            self.record_best(np.array(solution), fitness)
+
+    def record_best(self, solution, fitness):
+        """Keep the new best and its score; C&C and the summary then read it from the cache."""
+        self.best_fitness = fitness
+        self.best_solution = solution
+        self.best_generation = self.generation
+        if scores_are_probabilities(self.model, config.fitness_mode):
+            self.best_confidence = fitness
         else:
-            output_dir = os.path.join(base_dir, self.global_id)
+            # Margin scores only rank candidates; termination is judged on the exact probability
+            self.best_confidence = evaluate_batch(
+                solution[np.newaxis], self.model, self.target_class, exact=True
+            )[0]
+        get_fitness_cache().store(solution, self.model, self.target_class, self.best_confidence)
+        if self.candc is not None:
+            self.candc.report(self.global_id, self.best_confidence, self.generation)
+
 
-        os.makedirs(output_dir, exist_ok=True)
-        filename = f"{self.global_id}_confidence.png"
+    def save_image(self, image, gen, confidence, round_num=None):
+        """Queue a snapshot of the evolved image; rendering happens after the run (utils.artifacts)."""
+        with get_profiler().phase("snapshot"):
+            get_artifact_writer().record_snapshot(self.global_id, image, gen, confidence, round_num)
 
-        plt.plot(self.confidence_progress, label=f"{self.global_id}")
-        plt.xlabel("Generation")
-        plt.ylabel("Confidence")
-        plt.title(f"Confidence Progress - {self.global_id}")
-        plt.legend()
-        plt.savefig(os.path.join(output_dir, filename))
-        plt.close()
+    def plot_confidence_progress(self, round_num=None):
+        """Queue this round's confidence curve for the artifact store."""
+        with get_profiler().phase("snapshot"):
+            curve = self.confidence_progress.read(self.round_start)
+            get_artifact_writer().record_curve(self.global_id, curve, round_num)
 
+    def connect(self, transport, supernode_address):
+        """Switch from reading neighbor objects directly to message passing over `transport`."""
+        self.transport = transport
+        self.neighbor_addresses = [n.global_id for n in self.buffer]
+        self.supernode_address = supernode_address
+        self.published_fitness = 0.0
+        transport.register(self.global_id)
 
+    def exchange_messages(self):
+        # Publish our best to neighbors and our supernode, only when it improved
+        if self.best_solution is not None and self.best_fitness > self.published_fitness:
+            message = Migrant(self.global_id, self.best_fitness, self.best_solution)
+            for address in self.neighbor_addresses + [self.supernode_address]:
+                self.transport.send(address, message)
+            self.published_fitness = self.best_fitness
+
+        # Migrants carry the score their sender computed, so nothing is re-evaluated here
+        for message in self.transport.receive(self.global_id):
+            if message.fitness > self.fitness.max():
+                self.adopt(message.solution, message.fitness)
+                print(f"📬 {self.global_id} adopted better solution from {message.sender} (conf={message.fitness:.4f})")
 
     def communicate_with_neighbors(self):
+        with get_profiler().phase("communication"):
+            self._communicate()
+
+    def _communicate(self):
+        if self.transport is not None:
+            self.exchange_messages()
+            return
+
+        # Neighbors share our model and target, so their best_fitness is already the score we'd compute
         for neighbor in self.buffer:
-            if neighbor.best_solution is not None:
-                neighbor_conf = evaluate_fitness(neighbor.best_solution, self.model, self.target_class)
-                my_conf = evaluate_fitness(self.population, self.model, self.target_class)
-                if neighbor_conf > my_conf:
-                    self.population = neighbor.best_solution
-                    self.best_fitness = neighbor_conf
-                    self.best_solution = neighbor.best_solution
-                    print(f"📬 {self.global_id} adopted better solution from {neighbor.global_id} (conf={neighbor_conf:.4f})")
-
-    def evolve(self, round_num=None):
-        for gen in range(config.max_generations):
-            current_confidence = evaluate_fitness(self.population, self.model, self.target_class)
-            mutated_image = mutate(self.population, config.mutation_rate)
-            mutated_confidence = evaluate_fitness(mutated_image, self.model, self.target_class)
-
-            self.confidence_progress.append(current_confidence)
-
-            if gen % 5 == 0 or mutated_confidence >= config.target_confidence:
-                self.save_image(mutated_image, gen, mutated_confidence, round_num)
-
-            if mutated_confidence > current_confidence:
-                self.population = mutated_image
-#                print(f"✅ {self.global_id}: New solution accepted with confidence {mutated_confidence:.4f}")
-
-            if mutated_confidence > self.best_fitness:
-                self.best_fitness = mutated_confidence
-                self.best_solution = mutated_image
-
-            if mutated_confidence >= config.target_confidence:
-                print(f"🎯 {self.global_id} found a solution with confidence {mutated_confidence:.4f}")
-                self.save_image(mutated_image, gen, mutated_confidence, round_num)
+            if neighbor.best_solution is not None and neighbor.best_fitness > self.fitness.max():
+                self.adopt(neighbor.best_solution, neighbor.best_fitness)
+                print(f"📬 {self.global_id} adopted better solution from {neighbor.global_id} (conf={neighbor.best_fitness:.4f})")
+
+    def evaluate_offspring(self, offspring, parents):
+        """
+        Model scores for offspring of the given population members. With
+        incremental evaluation each mutant's intermediates are its parent's,
+        corrected for the pixels it changed; these are returned alongside.
+        """
+        mode = config.fitness_mode
+        if self.intermediates is None:
+            return evaluate_batch(offspring, self.model, self.target_class, mode=mode, buffer=self.features), None
+
+        profiler = get_profiler()
+        profiler.count("model_calls")
+        profiler.count("images_scored", len(offspring))
+        states = self.incremental.update(
+            self.intermediates[parents],
+            float_features(self.population[parents], self.parent_features), float_features(offspring, self.features),
+        )
+        return self.incremental.score(states, self.target_class, mode), states
+
+    def score_offspring(self, offspring, parents, gen):
+        """
+        Real-model scores for this generation's offspring. With the surrogate on,
+        only its top offspring_size picks are scored (every mutant is scored
+        during warm-up and on audit generations, which also train it).
+        Returns the scored offspring, their scores and their intermediates (or None).
+        """
+        if not config.surrogate_enabled:
+            return (offspring,) + self.evaluate_offspring(offspring, parents)
+
+        surrogate = get_surrogate(self.model, self.target_class, offspring[0].size)
+        audit = config.surrogate_audit_interval and gen % config.surrogate_audit_interval == 0
+        if not surrogate.ready():
+            fitness, states = self.evaluate_offspring(offspring, parents)
+            surrogate.update(offspring, fitness)
+            surrogate.record(len(offspring), len(offspring))
+            return offspring, fitness, states
+
+        chosen, predicted = surrogate.select(offspring, config.offspring_size)
+        if audit:
+            fitness, states = self.evaluate_offspring(offspring, parents)
+            surrogate.update(offspring, fitness)
+            surrogate.record(len(offspring), len(offspring), predicted, fitness, chosen)
+            return offspring, fitness, states
+
+        fitness, states = self.evaluate_offspring(offspring[chosen], parents[chosen])
+        surrogate.update(offspring[chosen], fitness)
+        surrogate.record(len(offspring), len(chosen), predicted[chosen], fitness)
+        return offspring[chosen], fitness, states
+
+    def evolve(self, round_num=None, generations=None):
+        """Run one round of `generations` (default config.max_generations) or until the target is hit."""
+        generations = config.max_generations if generations is None else generations
+        profiler = get_profiler()
+        with profiler.node_scope(self.global_id), profiler.phase("evolve"):
+            self._evolve_generations(round_num, profiler, generations)
+
+    def _evolve_generations(self, round_num, profiler, generations):
+        self.begin_round()
+        for gen in range(generations):
+            # Cooperative cancellation: another node already hit the target
+            if self.candc is not None and self.candc.should_stop():
                 self.plot_confidence_progress(round_num)
                 return
 
-            if gen > 0 and gen % config.communication_interval == 0:
-                self.communicate_with_neighbors()
+            with profiler.phase("mutation"):
+                offspring, parents = self.propose_offspring()
+            with profiler.phase("inference"):
+                offspring, offspring_fitness, offspring_states = self.score_offspring(offspring, parents, gen)
+            if self.accept_offspring(offspring, offspring_fitness, offspring_states, gen, round_num):
+                return
+
+        self.end_round(round_num, generations)
+
+    # The steps of one round, also driven directly by simulation.campaign
+
+    def begin_round(self):
+        self.round_start = len(self.confidence_progress)
+        self.dirty = True
+        if self.incremental is not None:
+            # Rebuilt from scratch each round so floating-point drift can't accumulate
+            self.intermediates = self.incremental.initial(float_features(self.population))
+
+    def propose_offspring(self):
+        """Start a generation: λ mutants of uniformly chosen parents, written into the reused offspring buffer."""
+        self.generation += 1
+        parents = self.rng.randint(0, self.population.shape[0], size=self.offspring.shape[0])
+        # Parents are copied straight into the offspring buffer and mutated there
+        np.take(self.population, parents, axis=0, out=self.offspring)
+        offspring = mutate_batch(
+            self.offspring, self.step_size.rate, out=self.offspring,
+            allow_repeats=config.mutation_allow_repeats, max_delta=self.step_size.max_delta, rng=self.rng
+        )
+        return offspring, parents
+
+    def accept_offspring(self, offspring, offspring_fitness, offspring_states, gen, round_num=None):
+        """
+        Finish a generation with the scored offspring: record progress, select
+        survivors, keep the best and talk to neighbors on schedule. Returns True
+        once this node reached the target (the round is then over for it).
+        """
+        profiler = get_profiler()
+        current_confidence = self.fitness.max()
+        self.confidence_progress.append(current_confidence)
+
+        best_child = np.argmax(offspring_fitness)
+        mutated_image = offspring[best_child]  # a view: copied only if it becomes the best
+        mutated_confidence = offspring_fitness[best_child]
+        self.step_size.update(np.mean(offspring_fitness > current_confidence), mutated_confidence > current_confidence)
+
+        snapshot_due = config.snapshot_interval and gen % config.snapshot_interval == 0
+        if snapshot_due:
+            self.save_image(mutated_image, gen, mutated_confidence, round_num)
+
+        with profiler.phase("selection"):
+            survivors = survivor_indices(
+                self.fitness, offspring_fitness,
+                method=config.selection, tournament_size=config.tournament_size, rng=self.rng
+            )
+            self.population = self.gather_survivors("population", self.population, offspring, survivors)
+            self.fitness = self.gather_survivors("fitness", self.fitness, offspring_fitness, survivors)
+            if offspring_states is not None:
+                self.intermediates = self.gather_survivors(
+                    "intermediates", self.intermediates, offspring_states, survivors
+                )
+
+        if mutated_confidence > self.best_fitness:
+            # The offspring buffer is reused next generation
+            self.record_best(mutated_image.copy(), mutated_confidence)
+
+            if self.best_confidence >= config.target_confidence:
+                print(f"🎯 {self.global_id} found a solution with confidence {self.best_confidence:.4f}")
+                if not snapshot_due:
+                    self.save_image(mutated_image, gen, self.best_confidence, round_num)
+                self.plot_confidence_progress(round_num)
+                return True
+
+        if gen > 0 and gen % config.communication_interval == 0:
+            self.communicate_with_neighbors()
+        return False
+
+    def gather_survivors(self, key, parents, offspring, survivors):
+        """
+        Rows `survivors` of parents followed by offspring, without allocating:
+        both are staged in a reused (μ+λ) pool and gathered into a reused μ-row
+        buffer, which becomes the new population (fitness, intermediates).
+        """
+        mu, lam = len(parents), len(offspring)
+        pool, out = self.selection_buffers.get(key, (None, None))
+        if (
+            pool is None or pool.shape[0] < mu + lam or pool.shape[1:] != parents.shape[1:]
+            or pool.dtype != parents.dtype or out.shape != parents.shape
+        ):
+            pool = np.empty((mu + max(lam, len(self.offspring)),) + parents.shape[1:], dtype=parents.dtype)
+            out = np.empty_like(parents)
+            self.selection_buffers[key] = (pool, out)
+        # parents may be last generation's `out`: staging them first makes reusing it safe
+        pool[:mu] = parents
+        pool[mu:mu + lam] = offspring
+        np.take(pool[:mu + lam], survivors, axis=0, out=out)
+        return out
 
-        # print(f"❌ {self.global_id} did not meet the threshold after {config.max_generations} generations.")
-        self.save_image(self.population, config.max_generations, current_confidence, round_num)
+    def end_round(self, round_num=None, generations=None):
+        """Close a round that ran all its generations without reaching the target."""
+        generations = config.max_generations if generations is None else generations
+        # print(f"❌ {self.global_id} did not meet the threshold after {generations} generations.")
+        best = np.argmax(self.fitness)
+        self.save_image(self.population[best], generations, self.fitness[best], round_num)
         self.plot_confidence_progress(round_num)
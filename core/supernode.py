@@ -1,32 +1,89 @@
 # /core/supernode.py
+from core.transport import Migrant
+from utils.profiling import get_profiler
 
 class SuperNode:
     def __init__(self, supernode_id, nodes):
         self.supernode_id = supernode_id
         self.nodes = nodes  # List[Node]
         self.peers = []     # List[SuperNode] – to be set later
+        self.forward = False
+        self.best_node = None  # snapshot taken by refresh_best() before a sync pass
+        self.address = f"S{supernode_id}"  # transport mailbox, also known to peers in other processes
 
-    def set_peers(self, all_supernodes):
-        self.peers = [sn for sn in all_supernodes if sn != self]
+    def set_peers(self, peers, forward=False):
+        """
+        Link to the given peer supernodes. With forward=True (sparse supernode
+        topologies) relayed solutions are passed on to the other peers as well,
+        so they reach every cluster in a few hops.
+        """
+        self.peers = list(peers)
+        self.forward = forward
+
+    def connect(self, transport):
+        """Relay between clusters over `transport` instead of touching peer nodes directly."""
+        self.transport = transport
+        self.best_message = None
+        transport.register(self.address)
+
+    def relay(self):
+        """
+        Drain our mailbox: a new best from one of our nodes goes out to the peer
+        supernodes, and a new best from a peer goes down to our nodes.
+        """
+        with get_profiler().phase("supernode_relay"):
+            self._relay()
+
+    def _relay(self):
+        peer_addresses = [peer.address for peer in self.peers]
+        for message in self.transport.receive(self.address):
+            if self.best_message is not None and message.fitness <= self.best_message.fitness:
+                continue
+            self.best_message = message
+
+            if message.sender in peer_addresses:
+                for node in self.nodes:
+                    self.transport.send(node.global_id, message)
+                print(f"🌐 SuperNode {self.supernode_id} relayed solution from {message.sender} to its nodes (conf={message.fitness:.4f})")
+                if not self.forward:
+                    continue
+                targets = [address for address in peer_addresses if address != message.sender]
+            else:
+                targets = peer_addresses
+            # Only strictly better solutions get here, so forwarding can't loop
+            relayed = Migrant(self.address, message.fitness, message.solution)
+            for address in targets:
+                self.transport.send(address, relayed)
 
     def get_best_node(self):
         return max(self.nodes, key=lambda n: n.best_fitness)
 
+    def refresh_best(self):
+        """Snapshot our best node so peers can read it in O(1) during a sync pass."""
+        self.best_node = self.get_best_node()
+
     def sync_with_peers(self):
-        """Exchange best solutions with peer supernodes and possibly update own nodes."""
-        my_best = self.get_best_node()
+        """
+        Exchange best solutions with peer supernodes and possibly update own nodes.
+        Call refresh_best() on every supernode first.
+        """
+        with get_profiler().phase("supernode_sync"):
+            self._sync_with_peers()
 
-        for peer in self.peers:
-            peer_best = peer.get_best_node()
+    def _sync_with_peers(self):
+        # Best nodes come from the refresh_best() snapshots, so a sync costs
+        # O(peers) instead of rescanning every peer's cluster
+        if not self.peers:
+            return
+        best_peer = max(self.peers, key=lambda peer: peer.best_node.best_fitness)
+        peer_best = best_peer.best_node
 
-            if peer_best.best_fitness > my_best.best_fitness:
-                # Push peer_best to all my nodes if better
-                for node in self.nodes:
-                    if peer_best.best_fitness > node.best_fitness:
-                        node.population = peer_best.best_solution
-                        node.best_fitness = peer_best.best_fitness
-                        node.best_solution = peer_best.best_solution
-                        print(f"🌐 SuperNode {self.supernode_id} pulled better solution from SuperNode {peer.supernode_id} for Node {node.global_id}")
+        if peer_best.best_fitness > self.best_node.best_fitness:
+            # Push peer_best to all my nodes if better
+            for node in self.nodes:
+                if peer_best.best_fitness > node.best_fitness:
+                    node.adopt(peer_best.best_solution, peer_best.best_fitness)
+                    print(f"🌐 SuperNode {self.supernode_id} pulled better solution from SuperNode {best_peer.supernode_id} for Node {node.global_id}")
 
     # def broadcast_best_solution(self):
     #     """(Optional) Broadcast best solution to all local nodes."""
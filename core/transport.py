@@ -0,0 +1,170 @@
+# /core/transport.py
+import multiprocessing
+import threading
+from collections import deque, namedtuple
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Client, Listener
+
+from config import config
+
+# A best solution published by a node (or relayed by a supernode)
+Migrant = namedtuple("Migrant", ["sender", "fitness", "solution"])
+
+
+class LocalTransport:
+    """
+    In-process stand-in: one bounded mailbox per address.
+    Mailboxes hold at most config.buffer_size messages; the oldest are dropped first.
+    """
+
+    def __init__(self, buffer_size=None):
+        self.buffer_size = buffer_size or config.buffer_size
+        self.mailboxes = {}
+        self.lock = threading.Lock()
+
+    def register(self, address):
+        with self.lock:
+            self.mailboxes.setdefault(address, deque(maxlen=self.buffer_size))
+
+    def send(self, address, message):
+        with self.lock:
+            self.mailboxes[address].append(message)
+
+    def receive(self, address):
+        """Drain and return every pending message for `address`."""
+        with self.lock:
+            mailbox = self.mailboxes[address]
+            messages = list(mailbox)
+            mailbox.clear()
+        return messages
+
+    def close(self):
+        pass
+
+
+def default_authkey():
+    """The process's multiprocessing authkey; child processes inherit it, so they can connect without being told."""
+    return bytes(multiprocessing.current_process().authkey)
+
+
+class RequestServer:
+    """
+    Localhost request/reply server on multiprocessing.connection.
+
+    A client must answer an HMAC challenge for `authkey` before anything it
+    sends is unpickled, so other local users can't feed it pickles. Each
+    connection is served on its own thread: handle(request) returns the reply,
+    sent back as ("ok", reply), and an exception is sent as ("error", message).
+    """
+
+    def __init__(self, handle, host="127.0.0.1", port=0, authkey=None, name="request-server"):
+        self.handle = handle
+        self.authkey = authkey or default_authkey()
+        self.listener = Listener((host, port), authkey=self.authkey)
+        self.address = self.listener.address
+        self.closed = False
+        self.thread = threading.Thread(target=self._accept, name=name, daemon=True)
+        self.thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn = self.listener.accept()
+            except (AuthenticationError, EOFError):
+                continue  # failed the challenge: dropped before anything was unpickled
+            except OSError:
+                if self.closed:
+                    return
+                continue
+            if self.closed:
+                conn.close()
+                return
+            threading.Thread(target=self._serve, args=(conn,), daemon=True).start()
+
+    def _serve(self, conn):
+        with conn:
+            while True:
+                try:
+                    request = conn.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    reply = ("ok", self.handle(request))
+                except Exception as exc:  # report to the caller instead of dropping its connection
+                    reply = ("error", str(exc))
+                conn.send(reply)
+
+    def close(self):
+        self.closed = True
+        # A blocked accept() isn't woken by closing the listener; connect once to release it
+        try:
+            Client(self.address, authkey=self.authkey).close()
+        except OSError:
+            pass
+        self.thread.join()
+        self.listener.close()
+
+
+class RequestClient:
+    """Client side of a RequestServer; call() returns the reply or raises RuntimeError."""
+
+    def __init__(self, address, authkey=None):
+        self.conn = Client(address, authkey=authkey or default_authkey())
+        self.lock = threading.Lock()
+
+    def call(self, *request):
+        with self.lock:
+            self.conn.send(request)
+            status, payload = self.conn.recv()
+        if status == "error":
+            raise RuntimeError(payload)
+        return payload
+
+    def close(self):
+        self.conn.close()
+
+
+class TransportBroker:
+    """
+    Localhost broker owning the mailboxes that SocketTransport clients talk to.
+    Only clients holding `authkey` (by default the multiprocessing authkey this
+    process and its children share) can connect.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, buffer_size=None, authkey=None):
+        self.mailboxes = LocalTransport(buffer_size)
+        self.server = RequestServer(self._handle, host, port, authkey, name="transport-broker")
+        self.address = self.server.address
+        self.authkey = self.server.authkey
+
+    def _handle(self, request):
+        op, address = request[0], request[1]
+        if op == "register":
+            return self.mailboxes.register(address)
+        elif op == "send":
+            return self.mailboxes.send(address, request[2])
+        elif op == "receive":
+            return self.mailboxes.receive(address)
+        raise ValueError(f"unknown op {op!r}")
+
+    def close(self):
+        self.server.close()
+
+
+class SocketTransport:
+    """Client side of the localhost broker; same interface as LocalTransport."""
+
+    def __init__(self, broker_address, authkey=None):
+        self.client = RequestClient(broker_address, authkey)
+
+    def register(self, address):
+        self.client.call("register", address)
+
+    def send(self, address, message):
+        self.client.call("send", address, message)
+
+    def receive(self, address):
+        return self.client.call("receive", address)
+
+    def close(self):
+        self.client.close()
@@ -1,10 +1,22 @@
 # /main.py
+import argparse
 from models.load_model import load_trained_model
 from simulation.run_simulation import run_simulation
+from simulation.island import run_island_simulation
+from simulation.campaign import run_campaign
 from config import config
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Distributed evolutionary adversarial attack")
+    parser.add_argument("--resume", action="store_true", help="continue from the last checkpoint of this experiment")
+    args = parser.parse_args()
+    # Only round-based runs write checkpoints
+    if args.resume and config.campaign_targets is not None:
+        parser.error("--resume is not supported for campaigns (campaign_targets is set)")
+    if args.resume and config.execution_mode == "islands":
+        parser.error("--resume is not supported in island mode (execution_mode = \"islands\")")
+
     # Load the trained model
     model = load_trained_model()
     
@@ -12,4 +24,9 @@ if __name__ == "__main__":
     target_class = 0  # Example: Trick classifier into predicting '8' instead of another digit
     
     # Run the simulation
-    run_simulation(model, target_class)
+    if config.campaign_targets is not None:
+        run_campaign(model)
+    elif config.execution_mode == "islands":
+        run_island_simulation(model, target_class)
+    else:
+        run_simulation(model, target_class, resume=args.resume)
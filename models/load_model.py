@@ -1,15 +1,61 @@
 from config import config
 import joblib
+import json
 import os
+import threading
 
-def load_trained_model():
-    if config.model_file:
-        model_path = config.model_file
-    else:
-        # fallback: guess model filename from config
-        model_path = f"model_{config.model_name}_{config.dataset_name}.pkl"
+# path -> ((mtime, mmap mode), model); models loaded once per process
+_model_cache = {}
+_model_cache_lock = threading.Lock()
 
-    # Set config dynamically based on dataset in the filename
+
+def metadata_path(model_path):
+    """Sidecar next to the model: model_SVM_mnist.pkl -> model_SVM_mnist.meta.json"""
+    return os.path.splitext(model_path)[0] + ".meta.json"
+
+
+def describe_model(model, dataset_name, image_height, image_width, pixel_max):
+    """Metadata recorded alongside a trained model."""
+    import sklearn
+
+    feature_names = getattr(model, "feature_names_in_", None)
+    return {
+        "dataset_name": dataset_name,
+        "model_class": type(model).__name__,
+        "image_height": image_height,
+        "image_width": image_width,
+        "pixel_max": pixel_max,
+        "n_features": int(getattr(model, "n_features_in_", image_height * image_width)),
+        "classes": [c.item() if hasattr(c, "item") else c for c in getattr(model, "classes_", [])],
+        "feature_names": None if feature_names is None else [str(name) for name in feature_names],
+        "sklearn_version": sklearn.__version__,
+    }
+
+
+def save_model(model, model_path, metadata):
+    """Store a model and its metadata sidecar. The model is left uncompressed so it can be memory-mapped."""
+    joblib.dump(model, model_path)
+    with open(metadata_path(model_path), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+
+def load_metadata(model_path):
+    """The model's sidecar as a dict, or None for models saved without one."""
+    path = metadata_path(model_path)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def _apply_metadata(model_path, metadata):
+    if metadata is not None:
+        config.image_height = metadata["image_height"]
+        config.image_width = metadata["image_width"]
+        config.pixel_max = metadata["pixel_max"]
+        return
+
+    # No sidecar (older models): guess from the filename
     if "mnist" in model_path:
         config.image_height = 28
         config.image_width = 28
@@ -19,10 +65,36 @@ def load_trained_model():
         config.image_width = 8
         config.pixel_max = 16
 
+
+def load_trained_model(model_path=None):
+    if model_path is None:
+        if config.model_file:
+            model_path = config.model_file
+        else:
+            # fallback: guess model filename from config
+            model_path = f"model_{config.model_name}_{config.dataset_name}.pkl"
+
     if not os.path.exists(model_path):
         raise FileNotFoundError(f"Model file not found: {model_path}. Please train the model first.")
-    
-    model = joblib.load(model_path)
+
+    # Image dimensions and pixel range come from the metadata sidecar when there is one
+    metadata = load_metadata(model_path)
+    _apply_metadata(model_path, metadata)
+
+    # Copy-on-write mapping: arrays are paged in from the file and shared through
+    # the page cache (libsvm needs writable buffers, so "r" won't do)
+    mmap_mode = "c" if config.model_mmap else None
+    key = os.path.realpath(model_path)
+    version = (os.path.getmtime(model_path), mmap_mode)
+    with _model_cache_lock:
+        cached = _model_cache.get(key)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        model = joblib.load(model_path, mmap_mode=mmap_mode)
+        if metadata is not None and getattr(model, "n_features_in_", metadata["n_features"]) != metadata["n_features"]:
+            raise ValueError(f"{metadata_path(model_path)} does not describe {model_path}: feature counts differ.")
+        _model_cache[key] = (version, model)
     print(f"Loaded model from {model_path}")
 
     return model
@@ -6,8 +6,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")
 
 import os
 import numpy as np
-import joblib
 from config import config
+from models.load_model import describe_model, save_model
 from sklearn.datasets import load_digits, fetch_openml
 from sklearn.model_selection import train_test_split
 from sklearn.svm import SVC
@@ -72,9 +72,10 @@ def train_model():
     accuracy = model.score(X_test, y_test)
     print(f"Training complete. Test accuracy: {accuracy:.4f}")
 
-    # 5) Save model
+    # 5) Save model with its metadata sidecar (dataset, image shape, pixel range, classes, feature names)
     filename = f"model_{config.model_name}_{config.dataset_name}.pkl"
-    joblib.dump(model, filename)
+    metadata = describe_model(model, config.dataset_name, config.image_height, config.image_width, config.pixel_max)
+    save_model(model, filename, metadata)
     print(f"Model saved to {filename}")
 
     # 6) Update config with model file path
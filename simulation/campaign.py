@@ -0,0 +1,183 @@
+# /simulation/campaign.py
+import os
+
+import numpy as np
+from config import config
+from config.paths import get_experiment_root
+from core.candc import CommandAndControl
+from simulation.cluster import initialize_clusters
+from simulation.run_simulation import plot_combined_progress
+from simulation.topology import Topology
+from utils.artifacts import close_artifact_writer, export_pngs, get_artifact_writer
+from utils.evaluation import evaluate_all_classes
+from utils.profiling import get_profiler
+
+
+def resolve_targets(model, targets=None):
+    """config.campaign_targets (or `targets`) as a list of class indices; "all" means every class."""
+    targets = config.campaign_targets if targets is None else targets
+    if targets == "all":
+        return list(range(len(model.classes_)))
+    return [int(target) for target in targets]
+
+
+class TargetRun:
+    """One target class of a campaign: its own clusters, C&C and termination."""
+
+    def __init__(self, model, target_class, topology):
+        self.target_class = target_class
+        self.clusters = initialize_clusters(model, target_class, topology, id_prefix=f"T{target_class}-")
+        self.nodes = [node for _, nodes in self.clusters for node in nodes]
+        self.candc = CommandAndControl()
+        for node in self.nodes:
+            self.candc.assign_node(node)
+        self.rounds = 0
+
+
+class SharedInference:
+    """
+    Scores the offspring of every node, whatever its target, with one
+    predict_proba call per generation; each node then reads its own target's
+    column. Images proposed by several nodes in the same generation (common
+    while targets share seeds) are scored once.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.model_calls = 0
+        self.images_proposed = 0
+        self.images_scored = 0
+
+    def score(self, offspring_batches):
+        images = np.concatenate(offspring_batches)
+        unique, inverse = np.unique(images.reshape(len(images), -1), axis=0, return_inverse=True)
+        probabilities = evaluate_all_classes(unique.reshape((-1,) + images.shape[1:]), self.model)
+
+        self.model_calls += 1
+        self.images_proposed += len(images)
+        self.images_scored += len(unique)
+        get_profiler().count("campaign_duplicates_skipped", len(images) - len(unique))
+        return probabilities[inverse.ravel()]
+
+
+def run_campaign_round(runs, inference, round_num):
+    """
+    One round for every node of every active target, in generation lockstep so
+    each generation's offspring share a single inference call.
+    """
+    profiler = get_profiler()
+    running = [node for run in runs for node in run.nodes]
+    for node in running:
+        node.begin_round()
+
+    for gen in range(config.max_generations):
+        # Cooperative cancellation, per target: nodes whose target was reached stop here
+        for node in running:
+            if node.candc.should_stop():
+                node.plot_confidence_progress(round_num)
+        running = [node for node in running if not node.candc.should_stop()]
+        if not running:
+            return
+
+        with profiler.phase("mutation"):
+            proposals = [node.propose_offspring() for node in running]
+        with profiler.phase("inference"):
+            probabilities = inference.score([offspring for offspring, _ in proposals])
+
+        still_running = []
+        start = 0
+        for node, (offspring, _) in zip(running, proposals):
+            fitness = probabilities[start:start + len(offspring), node.target_class]
+            start += len(offspring)
+            with profiler.node_scope(node.global_id):
+                if not node.accept_offspring(offspring, fitness, None, gen, round_num):
+                    still_running.append(node)
+        running = still_running
+
+    for node in running:
+        node.end_round(round_num)
+
+
+def write_campaign_summary(runs, inference):
+    lines = ["\n📊 Campaign summary:\n"]
+    for run in runs:
+        candc = run.candc
+        status = "✔️ reached" if candc.terminated else "❌ not reached"
+        best = ""
+        if candc.best_report is not None:
+            node_id, fitness, generation = candc.best_report
+            best = f", best {fitness:.4f} by {node_id} at generation {generation}"
+        lines.append(f"{status} target {run.target_class} after {run.rounds} round(s){best}\n")
+
+    saved = inference.images_proposed - inference.images_scored
+    lines.append(
+        f"\n🧮 Shared inference: {inference.model_calls} model calls scored {inference.images_scored} images "
+        f"for {inference.images_proposed} proposals ({saved} duplicates skipped)\n"
+    )
+
+    experiment_dir = get_experiment_root()
+    os.makedirs(experiment_dir, exist_ok=True)
+    with open(os.path.join(experiment_dir, "campaign_summary.txt"), "w") as f:
+        f.writelines(lines)
+    print("".join(lines))
+
+
+def run_campaign(model, targets=None):
+    """
+    Attack several target classes at once. Every target gets its own clusters
+    (on one shared topology) and its own C&C; all of them evolve in lockstep
+    and share one batched inference pass per generation. A target drops out
+    when it is reached; the campaign ends when all are reached or max_rounds
+    runs out. Offspring are always scored as probabilities: fitness_mode,
+    the surrogate and incremental evaluation don't apply here.
+    """
+    targets = resolve_targets(model, targets)
+    print(f"🔄 Starting campaign against targets {targets}...")
+
+    profiler = get_profiler()
+    with profiler.phase("setup"):
+        topology = Topology.build(
+            [config.nodes_per_cluster] * config.clusters, config.neighbors_per_node, seed=config.seed
+        )
+        runs = [TargetRun(model, target, topology) for target in targets]
+    inference = SharedInference(model)
+
+    round_num = 0
+    try:
+        while True:
+            active = [run for run in runs if not run.candc.terminated]
+            if not active:
+                print("🎯 Every target has been reached. Stopping now.")
+                break
+
+            print(f"\n🌀 Round {round_num} ({len(active)} target(s) active)")
+            profiler.start_round(round_num)
+            run_campaign_round(active, inference, round_num)
+
+            for run in active:
+                run.rounds += 1
+                if run.candc.check_termination():
+                    print(f"🎯 Target {run.target_class} reached.")
+                elif round_num % config.supernode_sync_interval == 0:
+                    for supernode, _ in run.clusters:
+                        supernode.refresh_best()
+                    for supernode, _ in run.clusters:
+                        supernode.sync_with_peers()
+
+            get_artifact_writer().flush()
+            round_num += 1
+            if config.max_rounds is not None and round_num >= config.max_rounds:
+                print(f"⏹️ Reached max_rounds={config.max_rounds}")
+                break
+    finally:
+        profiler.start_round(None)
+        close_artifact_writer()
+
+    with profiler.phase("plotting"):
+        plot_combined_progress([cluster for run in runs for cluster in run.clusters])
+    write_campaign_summary(runs, inference)
+    if profiler.enabled:
+        profiler.write_report(os.path.join(get_experiment_root(), "profile.json"))
+    if config.render_png and not config.headless:
+        export_pngs()
+    return runs
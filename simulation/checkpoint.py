@@ -0,0 +1,142 @@
+# /simulation/checkpoint.py
+import json
+import os
+
+import numpy as np
+from config import config
+from config.paths import get_experiment_root
+
+
+def get_checkpoint_dir():
+    return os.path.join(get_experiment_root(), "checkpoint")
+
+
+def _atomic_write(path, write):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        write(f)
+    os.replace(tmp_path, path)
+
+
+class Checkpointer:
+    """
+    Incremental checkpoints of a round-based run.
+
+    Each node's state lives in its own nodes/<node_id>.npz and is only
+    rewritten when the node is dirty (it evolved or adopted a solution since the
+    last save). manifest.json holds the round number, the neighbor topology,
+    each node's history length and the scheduler's state, and is replaced
+    last, atomically.
+    """
+
+    def __init__(self, directory=None):
+        self.directory = directory or get_checkpoint_dir()
+        self.node_dir = os.path.join(self.directory, "nodes")
+        self.manifest_path = os.path.join(self.directory, "manifest.json")
+
+    def exists(self):
+        return os.path.exists(self.manifest_path)
+
+    def save(self, clusters, round_num, scheduler=None):
+        os.makedirs(self.node_dir, exist_ok=True)
+        written = 0
+        for _, nodes in clusters:
+            for node in nodes:
+                # History must be on disk up to the length the manifest records
+                node.confidence_progress.flush()
+                if node.dirty:
+                    self._save_node(node)
+                    node.dirty = False
+                    written += 1
+
+        saved_clusters = []
+        for supernode, nodes in clusters:
+            index = {id(n): i for i, n in enumerate(nodes)}
+            saved_clusters.append({
+                "supernode_id": supernode.supernode_id,
+                "nodes": [
+                    {
+                        "global_id": node.global_id,
+                        "neighbors": [index[id(n)] for n in node.buffer],
+                        "history_length": len(node.confidence_progress),
+                    }
+                    for node in nodes
+                ],
+            })
+
+        manifest = {
+            "round_num": round_num,
+            "dataset_name": config.dataset_name,
+            "model_name": config.model_name,
+            "clusters": saved_clusters,
+            "scheduler": scheduler.get_state() if scheduler is not None else None,
+        }
+        _atomic_write(self.manifest_path, lambda f: f.write(json.dumps(manifest).encode()))
+        return written
+
+    def _save_node(self, node):
+        state = node.get_state()
+        _, keys, pos, has_gauss, cached_gaussian = state["rng_state"]
+        has_best = state["best_solution"] is not None
+        arrays = dict(
+            population=state["population"],
+            fitness=state["fitness"],
+            best_solution=state["best_solution"] if has_best else np.empty(0),
+            has_best=has_best,
+            best_fitness=state["best_fitness"],
+            best_confidence=state["best_confidence"],
+            best_generation=state["best_generation"],
+            generation=state["generation"],
+            rng_keys=keys,
+            rng_pos=pos,
+            rng_has_gauss=has_gauss,
+            rng_cached_gaussian=cached_gaussian,
+            step_size=json.dumps(state["step_size"]),
+        )
+        path = os.path.join(self.node_dir, f"{node.global_id}.npz")
+        _atomic_write(path, lambda f: np.savez(f, **arrays))
+
+    def _load_node(self, global_id):
+        with np.load(os.path.join(self.node_dir, f"{global_id}.npz")) as data:
+            return {
+                "population": data["population"],
+                "fitness": data["fitness"],
+                "best_solution": data["best_solution"] if data["has_best"] else None,
+                "best_fitness": float(data["best_fitness"]),
+                "best_confidence": float(data["best_confidence"]),
+                "best_generation": int(data["best_generation"]) if "best_generation" in data.files else None,
+                "generation": int(data["generation"]),
+                "rng_state": (
+                    "MT19937", data["rng_keys"], int(data["rng_pos"]),
+                    int(data["rng_has_gauss"]), float(data["rng_cached_gaussian"]),
+                ),
+                # Checkpoints from before step-size control start from the configured strength
+                "step_size": json.loads(str(data["step_size"])) if "step_size" in data.files else None,
+            }
+
+    def restore(self, clusters, scheduler=None):
+        """
+        Load node states and topology into freshly built clusters, and the
+        scheduler's state into `scheduler`; returns the next round number.
+        """
+        with open(self.manifest_path) as f:
+            manifest = json.load(f)
+
+        if len(manifest["clusters"]) != len(clusters):
+            raise ValueError("Checkpoint cluster count does not match the current config.")
+
+        for (_, nodes), saved in zip(clusters, manifest["clusters"]):
+            if len(saved["nodes"]) != len(nodes):
+                raise ValueError("Checkpoint nodes_per_cluster does not match the current config.")
+            for node, saved_node in zip(nodes, saved["nodes"]):
+                node.set_state(self._load_node(saved_node["global_id"]))
+                node.buffer = [nodes[i] for i in saved_node["neighbors"]]
+                node.confidence_progress.resume(saved_node["history_length"])
+                node.dirty = False
+
+        # Checkpoints from before scheduler state was saved start it afresh
+        if scheduler is not None and manifest.get("scheduler"):
+            scheduler.set_state(manifest["scheduler"])
+
+        print(f"♻️ Resumed from checkpoint at round {manifest['round_num']}")
+        return manifest["round_num"] + 1
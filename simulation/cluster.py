@@ -1,25 +1,43 @@
 # /simulation/cluster.py
 
-import random
 from core.node import Node
 from core.supernode import SuperNode
+from simulation.topology import Topology
 from config import config
 
-def initialize_clusters(model, target_class):
-    clusters = []
+def initialize_clusters(model, target_class, topology=None, id_prefix="", cluster_ids=None):
+    """
+    Build the nodes and supernodes and wire them up from a Topology (generated
+    from config when not given). The topology is kept on every supernode.
+    `id_prefix` keeps node ids unique when several target classes run side by side.
+    With `cluster_ids`, only those clusters get nodes; the others keep an empty
+    supernode as a peer (their nodes live in another process).
+    """
+    if topology is None:
+        topology = Topology.build([config.nodes_per_cluster] * config.clusters, config.neighbors_per_node, seed=config.seed)
 
-    for i in range(config.clusters):  # i = cluster_id
+    clusters = []
+    for i, neighbors in enumerate(topology.node_neighbors):  # i = cluster_id
+        if cluster_ids is not None and i not in cluster_ids:
+            neighbors = neighbors[:0]
         nodes = [
-            Node(cluster_id=i, local_node_id=j, model=model, target_class=target_class)
-            for j in range(config.nodes_per_cluster)
+            Node(cluster_id=i, local_node_id=j, model=model, target_class=target_class, id_prefix=id_prefix)
+            for j in range(len(neighbors))
         ]
 
-        # Assign neighbors within the same cluster
-        for node in nodes:
-            possible_neighbors = [n for n in nodes if n != node]
-            node.buffer = random.sample(possible_neighbors, min(config.neighbors_per_node, len(possible_neighbors)))
+        # Neighbors within the same cluster, resolved from the adjacency array
+        for node, row in zip(nodes, neighbors.tolist()):
+            node.buffer = [nodes[j] for j in row]
 
         supernode = SuperNode(supernode_id=i, nodes=nodes)
+        supernode.topology = topology
         clusters.append((supernode, nodes))
 
+    supernodes = [supernode for supernode, _ in clusters]
+    for supernode in supernodes:
+        supernode.set_peers(
+            [supernodes[j] for j in topology.peers(supernode.supernode_id)],
+            forward=topology.supernode_kind != "full",
+        )
+
     return clusters
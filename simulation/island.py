@@ -0,0 +1,217 @@
+# /simulation/island.py
+import multiprocessing
+import os
+import queue
+import threading
+import traceback
+
+from simulation.cluster import initialize_clusters
+from simulation.parallel import _config_snapshot, merge_surrogate_counters
+from simulation.run_simulation import plot_combined_progress, print_summary
+from utils.artifacts import close_artifact_writer, export_pngs
+from utils.profiling import get_profiler
+from core.candc import CommandAndControl
+from core.transport import LocalTransport, SocketTransport, TransportBroker
+from core.inference_server import InferenceServer, SocketInferenceClient
+from config import config
+from config.paths import get_experiment_root
+from utils.history import ConfidenceHistory
+from utils.surrogate import all_surrogates
+
+
+def _node_worker(node, candc):
+    """Evolve one island independently until C&C says stop or max_rounds epochs; no lockstep with other nodes."""
+    epoch = 0
+    while not candc.should_stop() and (config.max_rounds is None or epoch < config.max_rounds):
+        node.evolve(round_num=epoch)
+        epoch += 1
+
+
+def _supernode_worker(supernode, stop):
+    while not stop.is_set():
+        supernode.relay()
+        stop.wait(config.relay_interval)
+
+
+def _run_islands(clusters, candc, connect):
+    """Connect `clusters` to a transport and run their nodes and supernodes as threads until C&C says stop."""
+    supernodes = [supernode for supernode, _ in clusters]
+    transports = []
+    for supernode in supernodes:
+        transports.append(connect())
+        supernode.connect(transports[-1])
+    for supernode, nodes in clusters:
+        for node in nodes:
+            transports.append(connect())
+            node.connect(transports[-1], supernode.address)
+            candc.assign_node(node)
+
+    stop = threading.Event()
+    relays = [threading.Thread(target=_supernode_worker, args=(sn, stop), daemon=True) for sn in supernodes]
+    workers = [
+        threading.Thread(target=_node_worker, args=(node, candc), name=node.global_id)
+        for _, nodes in clusters for node in nodes
+    ]
+    for thread in relays + workers:
+        thread.start()
+    try:
+        for thread in workers:
+            thread.join()
+    finally:
+        # Also reached on Ctrl-C: node threads only stop once C&C cancels them
+        candc.cancel_event.set()
+        for thread in workers:
+            thread.join()
+        stop.set()
+        for thread in relays:
+            thread.join()
+        for transport in set(transports):
+            transport.close()
+
+
+def _island_process(config_values, model, target_class, topology, cluster_ids, states, broker_address, authkey,
+                    cancel_event, inference_address, results):
+    """
+    Run some of the clusters in this process; node states, histories, profiles
+    and surrogate counters go back through `results`.
+    """
+    for key, value in config_values.items():
+        setattr(config, key, value)
+    try:
+        if inference_address is not None:
+            model = SocketInferenceClient(inference_address)
+        clusters = initialize_clusters(model, target_class, topology, cluster_ids=cluster_ids)
+        clusters = [clusters[i] for i in cluster_ids]
+        for _, nodes in clusters:
+            for node in nodes:
+                node.set_state(states[node.global_id])
+                # In-memory history; the parent appends it to the node's store
+                node.confidence_progress = ConfidenceHistory()
+
+        candc = CommandAndControl(cancel_event=cancel_event)
+        _run_islands(clusters, candc, lambda: SocketTransport(broker_address, authkey))
+        close_artifact_writer()
+        profiler = get_profiler()
+        results.put(("ok", {
+            node.global_id: (
+                node.get_state(), node.confidence_progress.read(),
+                {round_num: profiler.pop_node(round_num, node.global_id) for round_num in list(profiler.rounds)},
+            )
+            for _, nodes in clusters for node in nodes
+        }, [surrogate.pop_counters() for surrogate in all_surrogates()]))
+    except BaseException:
+        cancel_event.set()  # don't leave the other processes running for a target nobody reports
+        results.put(("error", traceback.format_exc(), None))
+
+
+def _run_island_processes(clusters, candc, model, target_class, broker, inference_server):
+    """Run the clusters split over config.island_processes processes, then load their results into `clusters`."""
+    groups = [
+        list(range(len(clusters)))[i::config.island_processes]
+        for i in range(min(config.island_processes, len(clusters)))
+    ]
+    topology = clusters[0][0].topology
+    nodes = {node.global_id: node for _, cluster_nodes in clusters for node in cluster_nodes}
+    cancel_event = multiprocessing.Event()
+    results = multiprocessing.Queue()
+    # With an inference server the processes hold no model, just a client for it
+    inference_address = inference_server.address if inference_server is not None else None
+    if inference_server is not None:
+        model = None
+    processes = [
+        multiprocessing.Process(
+            target=_island_process,
+            args=(
+                _config_snapshot(), model, target_class, topology, cluster_ids,
+                {node.global_id: node.get_state() for i in cluster_ids for node in clusters[i][1]},
+                broker.address, broker.authkey, cancel_event, inference_address, results,
+            ),
+            name=f"islands-{n}",
+        )
+        for n, cluster_ids in enumerate(groups)
+    ]
+    for process in processes:
+        process.start()
+
+    outcomes = []
+    try:
+        while len(outcomes) < len(processes):
+            try:
+                outcomes.append(results.get(timeout=1.0))
+            except queue.Empty:
+                if any(process.exitcode not in (None, 0) for process in processes):
+                    raise RuntimeError("An island process died without reporting its results")
+    finally:
+        cancel_event.set()
+        for process in processes:
+            process.join()
+
+    for status, payload, surrogate_counters in outcomes:
+        if status == "error":
+            raise RuntimeError(f"Island process failed:\n{payload}")
+        # Every node attacks the same model and target, so any of them finds the surrogate
+        merge_surrogate_counters(next(iter(nodes.values())), surrogate_counters)
+        for global_id, (state, progress, profile) in payload.items():
+            node = nodes[global_id]
+            node.set_state(state)
+            node.confidence_progress.extend(progress)
+            for round_num, stats in profile.items():
+                get_profiler().merge(round_num, global_id, stats)
+            if node.best_solution is not None:
+                candc.report(global_id, node.best_confidence, node.best_generation)
+
+
+def run_island_simulation(model, target_class):
+    """
+    Asynchronous island model: every node and supernode runs as its own worker
+    thread and they only exchange best solutions as messages over a transport
+    (in-process mailboxes, or an authenticated localhost socket broker). With
+    config.island_processes the clusters are split over that many processes,
+    whose threads talk through the socket broker. With config.inference_server
+    their predictions are coalesced by one server.
+    """
+    print(f"🔄 Starting island evolution ({config.transport} transport)...")
+
+    inference_server = None
+    if config.inference_server:
+        # Every node thread is a caller
+        inference_server = InferenceServer(model, callers=config.clusters * config.nodes_per_cluster)
+        model = inference_server.client()
+    clusters = initialize_clusters(model, target_class)
+
+    broker = None
+    if config.transport == "socket":
+        broker = TransportBroker()
+        connect = lambda: SocketTransport(broker.address, broker.authkey)
+    elif config.transport == "local":
+        if config.island_processes:
+            raise ValueError("island_processes needs the socket transport")
+        shared = LocalTransport()
+        connect = lambda: shared
+    else:
+        raise ValueError(f"Unknown transport: {config.transport}")
+
+    candc = CommandAndControl()
+    try:
+        if config.island_processes:
+            for _, nodes in clusters:
+                for node in nodes:
+                    candc.assign_node(node)
+            _run_island_processes(clusters, candc, model, target_class, broker, inference_server)
+        else:
+            _run_islands(clusters, candc, connect)
+    finally:
+        if broker is not None:
+            broker.close()
+        close_artifact_writer()
+
+    print("\n✅ Simulation ended (terminated =", candc.terminated, ")")
+    plot_combined_progress(clusters)
+    print_summary(clusters)
+    if inference_server is not None:
+        inference_server.close()
+        print(inference_server.summary())
+    if get_profiler().enabled:
+        get_profiler().write_report(os.path.join(get_experiment_root(), "profile.json"))
+    if config.render_png and not config.headless:
+        export_pngs()
@@ -0,0 +1,224 @@
+# /simulation/parallel.py
+import multiprocessing
+import multiprocessing.util
+from types import SimpleNamespace
+
+from config import config
+from core.inference_server import InferenceServer, SocketInferenceClient
+from utils.artifacts import get_artifact_writer
+from utils.fitness_cache import get_fitness_cache
+from utils.history import ConfidenceHistory
+from utils.profiling import get_profiler
+from utils.shared_memory import SharedModel, SolutionBoard, attach_model
+from utils.surrogate import all_surrogates, get_surrogate
+
+# Per-worker globals, filled once by _init_worker
+_worker_model = None
+_worker_model_shm = None  # keeps the shared model's block mapped
+_worker_target_class = None
+_worker_candc = None
+_worker_board = None
+_worker_nodes = {}
+_worker_round = None  # round of the last task, so snapshots are flushed once per round
+
+
+def _config_snapshot():
+    """Plain config values, so spawn-started workers see the parent's runtime config."""
+    return {
+        key: value for key, value in vars(config).items()
+        if not key.startswith("_") and isinstance(value, (int, float, str, bool, type(None)))
+    }
+
+
+def _init_worker(config_values, target_class, cancel_event, model=None, model_handle=None, board_handle=None,
+                 inference_address=None):
+    global _worker_model, _worker_model_shm, _worker_target_class, _worker_candc, _worker_board
+    from core.candc import CommandAndControl
+    from utils.artifacts import close_artifact_writer
+
+    for key, value in config_values.items():
+        setattr(config, key, value)
+
+    if inference_address is not None:
+        # No model in this process: every prediction goes to the parent's inference server
+        _worker_model = SocketInferenceClient(inference_address)
+        multiprocessing.util.Finalize(None, _worker_model.close, exitpriority=5)
+    elif model_handle is not None:
+        _worker_model, _worker_model_shm = attach_model(model_handle)
+    else:
+        # The parent's own model, so parent and workers always score with the same one
+        _worker_model = model
+    if board_handle is not None:
+        _worker_board = SolutionBoard.attach(board_handle)
+    _worker_target_class = target_class
+    # Local C&C whose cancel signal is shared with the parent and the other workers
+    _worker_candc = CommandAndControl(cancel_event=cancel_event)
+    # Pool workers skip atexit, but multiprocessing finalizers still run on exit
+    multiprocessing.util.Finalize(None, close_artifact_writer, exitpriority=10)
+
+
+def _get_worker_node(cluster_id, local_node_id):
+    from core.node import Node
+
+    key = (cluster_id, local_node_id)
+    if key not in _worker_nodes:
+        _worker_nodes[key] = Node(cluster_id, local_node_id, _worker_model, _worker_target_class)
+        _worker_nodes[key].candc = _worker_candc
+    return _worker_nodes[key]
+
+
+def frozen_neighbors(neighbors):
+    """Read-only stand-ins for neighbors given as (global_id, best_solution, best_fitness) at the start of a round."""
+    return [
+        SimpleNamespace(global_id=global_id, best_solution=best_solution, best_fitness=best_fitness)
+        for global_id, best_solution, best_fitness in neighbors
+    ]
+
+
+def merge_surrogate_counters(node, counters):
+    """Add a worker's surrogate counters to this process's surrogate for `node`, so the summary covers them."""
+    for worker_counters in counters:
+        get_surrogate(node.model, node.target_class, node.population[0].size).merge_counters(worker_counters)
+
+
+def _evolve_node_task(task):
+    global _worker_round
+    cluster_id, local_node_id, state, neighbors, round_num, generations = task
+    if round_num != _worker_round:
+        # First task of a new round: the last round's snapshots go to the writer as
+        # one chunk per worker (the final round's are written when the worker exits)
+        if _worker_round is not None:
+            get_artifact_writer().flush()
+        _worker_round = round_num
+
+    node = _get_worker_node(cluster_id, local_node_id)
+    node.set_state(state)
+    # In-memory history for this round only; the parent appends it to the node's store
+    node.confidence_progress = ConfidenceHistory()
+    # Neighbors are frozen at their start-of-round best solutions; with the shared
+    # board each one arrives as (global_id, board index) and is read in place
+    if _worker_board is not None:
+        neighbors = [(global_id,) + _worker_board.latest(index) for global_id, index in neighbors]
+    node.buffer = frozen_neighbors(neighbors)
+
+    profiler = get_profiler()
+    profiler.start_round(round_num)
+    node.evolve(round_num=round_num, generations=generations)
+    return (
+        node.get_state(), node.confidence_progress.read(), profiler.pop_node(round_num, node.global_id),
+        [surrogate.pop_counters() for surrogate in all_surrogates()],
+    )
+
+
+class ParallelRoundExecutor:
+    """
+    Runs the node evolutions of one round on a process pool.
+
+    Each worker loads the model once; only node state travels between processes.
+    Every node draws from its own seeded RNG and sees its neighbors as they were
+    at the start of the round, so results don't depend on which worker ran it
+    and match run_round_sequential, which freezes neighbors the same way. The
+    exception is surrogate prefiltering: each worker trains its own surrogate
+    (their counters are merged into the parent's for the summary).
+
+    Workers are handed `model` (loaded from config.model_file when not given),
+    so they score with the same model as the parent. With
+    config.shared_memory it is placed in shared memory and mapped read-only
+    by every worker instead of each getting its own copy, and best
+    solutions are published to a shared SolutionBoard so tasks name their
+    neighbors by board index rather than carrying pickled copies.
+
+    With config.inference_server the workers hold no model at all: the parent
+    runs an InferenceServer and every worker's predictions are coalesced there.
+    """
+
+    def __init__(self, target_class, cancel_event, num_workers=None, model=None, nodes=None):
+        self.num_workers = num_workers or config.num_workers
+        self.shared_model = None
+        self.board = None
+        self.inference_server = None
+        if model is None:
+            # Load here, not in the initializer: a failing initializer makes the pool respawn workers forever
+            from models.load_model import load_trained_model
+            model = load_trained_model()
+        worker_model = model
+        model_handle = board_handle = inference_address = None
+        if config.inference_server:
+            self.inference_server = InferenceServer(model, callers=self.num_workers)
+            inference_address = self.inference_server.address
+            worker_model = None
+        elif config.shared_memory:
+            self.shared_model = SharedModel(model)
+            model_handle = self.shared_model.handle()
+            worker_model = None
+        if config.shared_memory and nodes:
+            population = nodes[0].population
+            self.board = SolutionBoard(len(nodes), population.shape[1:], population.dtype)
+            self.board_index = {node.global_id: i for i, node in enumerate(nodes)}
+            self.published = [None] * len(nodes)
+            board_handle = self.board.handle()
+
+        self.pool = multiprocessing.Pool(
+            self.num_workers,
+            initializer=_init_worker,
+            initargs=(
+                _config_snapshot(), target_class, cancel_event, worker_model, model_handle, board_handle,
+                inference_address,
+            ),
+        )
+
+    def publish(self, nodes):
+        """Write every best solution that changed since the last round to the board."""
+        for node in nodes:
+            index = self.board_index[node.global_id]
+            if node.best_solution is not None and node.best_fitness != self.published[index]:
+                self.board.publish(index, node.best_solution, node.best_fitness)
+                self.published[index] = node.best_fitness
+
+    def _neighbor_refs(self, node):
+        if self.board is not None:
+            return [(n.global_id, self.board_index[n.global_id]) for n in node.buffer]
+        return [(n.global_id, n.best_solution, n.best_fitness) for n in node.buffer]
+
+    def run_round(self, nodes, round_num, budgets=None):
+        """Evolve `nodes` for one round; `budgets` maps global_id to generations (default max_generations)."""
+        if self.board is not None:
+            self.publish(nodes)
+        budgets = budgets or {}
+        tasks = [
+            (
+                node.cluster_id, node.local_node_id, node.get_state(), self._neighbor_refs(node), round_num,
+                budgets.get(node.global_id),
+            )
+            for node in nodes
+        ]
+        chunksize = max(1, len(tasks) // (self.num_workers * 4))
+
+        results = self.pool.map(_evolve_node_task, tasks, chunksize=chunksize)
+        for node, (state, progress, profile, surrogate_counters) in zip(nodes, results):
+            get_profiler().merge(round_num, node.global_id, profile)
+            merge_surrogate_counters(node, surrogate_counters)
+            node.set_state(state)
+            node.confidence_progress.extend(progress)
+            if node.best_solution is not None:
+                # Scores computed in the worker seed the parent's cache for C&C and the summary
+                get_fitness_cache().store(node.best_solution, node.model, node.target_class, node.best_confidence)
+                if node.candc is not None:
+                    node.candc.report(node.global_id, node.best_confidence, node.best_generation)
+
+    def close(self):
+        self.pool.close()
+        self.pool.join()
+        if self.board is not None:
+            self.board.close()
+        if self.shared_model is not None:
+            self.shared_model.close()
+        if self.inference_server is not None:
+            self.inference_server.close()
+            print(self.inference_server.summary())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
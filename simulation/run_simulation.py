@@ -1,123 +1,39 @@
 # /simulation/run_simulation.py
-import matplotlib.pyplot as plt
 from simulation.cluster import initialize_clusters
 from core.candc import CommandAndControl
+from simulation.parallel import ParallelRoundExecutor, frozen_neighbors
+from simulation.checkpoint import Checkpointer
+from simulation.scheduler import make_scheduler
+from simulation.topology_export import start_topology_export
 from config import config
-from utils.evaluation import evaluate_fitness
+from utils.evaluation import evaluate_batch
+from utils.fitness_cache import get_fitness_cache
+from utils.history import HistoryReader
+from utils.profiling import get_profiler
+from utils.surrogate import all_surrogates
+from utils.artifacts import get_artifact_writer, close_artifact_writer, export_pngs
 from config.paths import get_experiment_root
 import os
-import math
-import networkx as nx
+import multiprocessing
+import numpy as np
 
 
-import math
-import os
-import networkx as nx
-import matplotlib.pyplot as plt
-
-def visualize_topology(clusters, out_path="topology.png"):
-    """
-    Visualization that doesn't 'hard-code' a node as supernode:
-    - For cluster i, the supernode is shown as a separate red node labeled S{i}
-    - The cluster's normal nodes are in skyblue
-    - Edges for neighbor connections are black
-    - Supernodes form a ring in magenta edges
-    - No references to best node or node[0]
-    """
-
-    G = nx.Graph()
-    positions = {}
-    node_colors = {}
-
-    n_clusters = len(clusters)
-
-    # --- 1) Place supernodes in a big ring (radius=10) ---
-    R = 10
-    supernode_labels = []
-    for i, (supernode, nodes) in enumerate(clusters):
-        s_label = f"S{supernode.supernode_id}"  # e.g. S0, S1, ...
-        supernode_labels.append(s_label)
-
-        angle = 2 * math.pi * i / n_clusters
-        x = R * math.cos(angle)
-        y = R * math.sin(angle)
-
-        # Add to the graph
-        G.add_node(s_label)
-        positions[s_label] = (x, y)
-        # We'll color supernodes red
-        node_colors[s_label] = "red"
-
-    # --- 2) Connect supernodes in a ring with magenta edges ---
-    for i in range(n_clusters):
-        s1 = supernode_labels[i]
-        s2 = supernode_labels[(i + 1) % n_clusters]
-        G.add_edge(s1, s2, color="magenta")
-
-    # --- 3) Place cluster nodes around each supernode (small ring radius=3) ---
-    cluster_radius = 3
-
-    for i, (supernode, nodes) in enumerate(clusters):
-        s_label = f"S{supernode.supernode_id}"
-        sx, sy = positions[s_label]
-        n_nodes = len(nodes)
-
-        for j, node in enumerate(nodes):
-            # place each cluster node around the supernode
-            angle = 2 * math.pi * j / n_nodes
-            rx = sx + cluster_radius * math.cos(angle)
-            ry = sy + cluster_radius * math.sin(angle)
-
-            # Insert into graph
-            G.add_node(node.global_id)
-            positions[node.global_id] = (rx, ry)
-            node_colors[node.global_id] = "skyblue"  # normal cluster node
-
-            # Add edges for neighbor connections (black)
-            for neighbor in node.buffer:
-                if not G.has_edge(node.global_id, neighbor.global_id):
-                    G.add_edge(node.global_id, neighbor.global_id, color="black")
-
-        # If you DO want an edge from supernode to each cluster node, do:
+def plot_combined_progress(clusters):
+    # Flush in-memory tails so the reader sees every node's complete history
+    for _, nodes in clusters:
         for node in nodes:
-            G.add_edge(s_label, node.global_id, color="gray")
-
-    # --- 4) Prepare to draw
-    edge_colors = [G[u][v].get("color", "gray") for u, v in G.edges()]
-    node_color_list = [node_colors[n] for n in G.nodes()]
-
-    labels = {n: n for n in G.nodes()}
-
-    plt.figure(figsize=(12, 8))
-    nx.draw(
-        G,
-        pos=positions,
-        labels=labels,
-        with_labels=True,
-        node_color=node_color_list,
-        edge_color=edge_colors,
-        node_size=1000,
-        font_size=8
-    )
-    plt.title("Distributed System Topology: True Clusters & Supernodes")
-    plt.axis("off")
-
-    # Ensure directory exists if out_path has a subdir
-    out_dir = os.path.dirname(out_path)
-    if out_dir:
-        os.makedirs(out_dir, exist_ok=True)
-
-    plt.tight_layout()
-    plt.savefig(out_path)
-    plt.close()
-    print(f"✅ Topology saved to {out_path}")
+            node.confidence_progress.flush()
+    if config.headless:
+        return
 
+    import matplotlib.pyplot as plt
 
-def plot_combined_progress(clusters):
+    reader = HistoryReader()
     plt.figure(figsize=(10, 6))
     for supernode, nodes in clusters:
         for node in nodes[:3]:  # first 3 nodes for clarity
-            plt.plot(node.confidence_progress, label=node.global_id)
+            generations, values = reader.downsample(node.global_id)
+            plt.plot(generations, values, label=node.global_id)
     
     plt.xlabel("Generation")
     plt.ylabel("Confidence")
@@ -130,18 +46,63 @@ def plot_combined_progress(clusters):
     plt.savefig(outfile)
     plt.close()
 
-def print_summary(clusters):
-    from utils.evaluation import evaluate_fitness
+def print_summary(clusters, scheduler=None):
+    all_nodes = [node for _, nodes in clusters for node in nodes]
+    scored = [node for node in all_nodes if node.best_solution is not None]
+
+    confidences = {}
+    if scored:
+        scores = evaluate_batch(
+            [node.best_solution for node in scored], scored[0].model, scored[0].target_class,
+            cache=get_fitness_cache()
+        )
+        confidences = {node.global_id: score for node, score in zip(scored, scores)}
 
     summary_lines = []
     summary_lines.append("\n📊 Summary of Final Best Solutions:\n")
-    for supernode, nodes in clusters:
-        for node in nodes:
-            if node.best_solution is not None:
-                confidence = evaluate_fitness(node.best_solution, node.model, node.target_class)
-                summary_lines.append(f"✔️ {node.global_id} - Final Confidence: {confidence:.4f}\n")
-            else:
-                summary_lines.append(f"❌ {node.global_id} - No valid solution found.\n")
+    for node in all_nodes:
+        if node.global_id in confidences:
+            summary_lines.append(f"✔️ {node.global_id} - Final Confidence: {confidences[node.global_id]:.4f}\n")
+        else:
+            summary_lines.append(f"❌ {node.global_id} - No valid solution found.\n")
+
+    candc = all_nodes[0].candc if all_nodes else None
+    if candc is not None and candc.best_report is not None:
+        node_id, fitness, generation = candc.best_report
+        status = "target reached" if candc.terminated else "target not reached"
+        total_generations = sum(node.generation for node in all_nodes)
+        summary_lines.append(
+            f"\n⏱️ Best confidence {fitness:.4f} by {node_id} at generation {generation} ({status}; "
+            f"{total_generations} generations across all nodes)\n"
+        )
+    if scheduler is not None and config.scheduler != "uniform" and scheduler.budgets:
+        budgets = list(scheduler.budgets.values())
+        summary_lines.append(
+            f"📐 Scheduler ({config.scheduler}): last round's budgets ranged {min(budgets)}-{max(budgets)} "
+            f"generations; {scheduler.reseeds} reseed(s)\n"
+        )
+    if config.step_size_control != "fixed" and all_nodes:
+        rates = [node.step_size.rate for node in all_nodes]
+        deltas = [node.step_size.max_delta for node in all_nodes]
+        restarts = sum(node.step_size.restarts for node in all_nodes)
+        summary_lines.append(
+            f"🎚️ Step size ({config.step_size_control}): final mutation rate {np.mean(rates):.4f}, "
+            f"max delta {np.mean(deltas):.1f} on average; {restarts} restart(s)\n"
+        )
+
+    cache_stats = get_fitness_cache().stats()
+    summary_lines.append(
+        f"\n🗃️ Fitness cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"(hit rate {cache_stats['hit_rate']:.2%})\n"
+    )
+    for surrogate in all_surrogates():
+        stats = surrogate.stats()
+        recall = "n/a" if stats["topk_recall"] is None else f"{stats['topk_recall']:.2%}"
+        error = "n/a" if stats["mean_abs_error"] is None else f"{stats['mean_abs_error']:.4f}"
+        summary_lines.append(
+            f"🔮 Surrogate: screened {stats['screened']} mutants, scored {stats['evaluated']} with the model "
+            f"({stats['model_images_saved']} saved); top-k recall {recall}, mean abs error {error}\n"
+        )
 
     experiment_dir = get_experiment_root()
     summary_file = os.path.join(experiment_dir, "summary.txt")
@@ -151,48 +112,106 @@ def print_summary(clusters):
     # Also print to console
     print("".join(summary_lines))
 
-def run_simulation(model, target_class):
+def run_round_sequential(clusters, candc, round_num, budgets=None):
+    budgets = budgets or {}
+    # Like pool workers, every node sees its neighbors as they were at the start
+    # of the round, so results don't depend on num_workers or evaluation order
+    snapshot = {
+        node.global_id: [(n.global_id, n.best_solution, n.best_fitness) for n in node.buffer]
+        for _, nodes in clusters for node in nodes
+    }
+    for _, nodes in clusters:
+        for node in nodes:
+            neighbors = node.buffer
+            node.buffer = frozen_neighbors(snapshot[node.global_id])
+            try:
+                node.evolve(round_num=round_num, generations=budgets.get(node.global_id))
+            finally:
+                node.buffer = neighbors
+            if candc.check_termination():
+                print("🎯 A node has reached the threshold. Stopping now.")
+                return
+
+def run_simulation(model, target_class, resume=False):
     print("🔄 Starting evolution process...")
 
-    clusters = initialize_clusters(model, target_class)
-
-    # Visualize the initial topology
-    visualize_topology(clusters, out_path="topology.png")
-
-
-    candc = CommandAndControl()
+    profiler = get_profiler()
+    with profiler.phase("setup"):
+        clusters = initialize_clusters(model, target_class)
+    checkpointer = Checkpointer()
+    # Decides how many generations each node gets per round
+    scheduler = make_scheduler(clusters)
 
-    # Link supernodes as peers
-    supernodes = [supernode for supernode, _ in clusters]
-    for supernode in supernodes:
-        supernode.set_peers(supernodes)
+    round_num = 0
+    topology_export = None
+    if resume:
+        if not checkpointer.exists():
+            raise FileNotFoundError(f"No checkpoint found in {checkpointer.directory}")
+        round_num = checkpointer.restore(clusters, scheduler)
+    elif config.export_topology:
+        # Edge list, GraphML and plot are written on a background thread while evolution runs
+        topology_export = start_topology_export(clusters[0][0].topology)
+
+    # Pool workers share the cancellation signal so a hit in one process stops the others
+    cancel_event = multiprocessing.Event() if config.num_workers > 1 else None
+    candc = CommandAndControl(cancel_event=cancel_event)
 
     # Register all nodes
     for _, nodes in clusters:
         for node in nodes:
             candc.assign_node(node)
 
-    round_num = 0
-    while not candc.terminated:
-        print(f"\n🌀 Round {round_num}")
-        for _, nodes in clusters:
-            for node in nodes:
-                node.evolve(round_num=round_num)
-                candc.check_termination()
-                if candc.terminated:
+    executor = None
+    if config.num_workers > 1:
+        all_nodes = [node for _, nodes in clusters for node in nodes]
+        executor = ParallelRoundExecutor(target_class, cancel_event, model=model, nodes=all_nodes)
+
+    try:
+        while not candc.terminated:
+            print(f"\n🌀 Round {round_num}")
+            profiler.start_round(round_num)
+            budgets = scheduler.plan(round_num)
+            if executor is not None:
+                # Whole round on the pool; termination is checked between rounds
+                executor.run_round([node for _, nodes in clusters for node in nodes], round_num, budgets)
+                if candc.check_termination():
                     print("🎯 A node has reached the threshold. Stopping now.")
-                    break
-            if candc.terminated:
+            else:
+                run_round_sequential(clusters, candc, round_num, budgets)
+            if not candc.terminated:
+                scheduler.observe(round_num)
+
+            # Supernode communication
+            if round_num % config.supernode_sync_interval == 0:
+                print(f"\n🌐 Supernode syncing at round {round_num}")
+                for supernode, _ in clusters:
+                    supernode.refresh_best()
+                for supernode, _ in clusters:
+                    supernode.sync_with_peers()
+
+            # Hand this round's snapshots to the writer thread without waiting on disk
+            get_artifact_writer().flush()
+            if config.checkpoint_interval and round_num % config.checkpoint_interval == 0:
+                with profiler.phase("checkpoint"):
+                    checkpointer.save(clusters, round_num, scheduler)
+            round_num += 1
+            if config.max_rounds is not None and round_num >= config.max_rounds:
+                print(f"⏹️ Reached max_rounds={config.max_rounds}")
                 break
-
-        # Supernode communication
-        if round_num % config.supernode_sync_interval == 0:
-            print(f"\n🌐 Supernode syncing at round {round_num}")
-            for supernode, _ in clusters:
-                supernode.sync_with_peers()
-
-        round_num += 1
+    finally:
+        profiler.start_round(None)
+        if executor is not None:
+            executor.close()
+        close_artifact_writer()
+        if topology_export is not None:
+            topology_export.join()
 
     print("\n✅ Simulation ended (terminated =", candc.terminated, ")")
-    plot_combined_progress(clusters)
-    print_summary(clusters)
+    with profiler.phase("plotting"):
+        plot_combined_progress(clusters)
+    print_summary(clusters, scheduler)
+    if profiler.enabled:
+        profiler.write_report(os.path.join(get_experiment_root(), "profile.json"))
+    if config.render_png and not config.headless:
+        export_pngs()
+    return clusters
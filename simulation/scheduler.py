@@ -0,0 +1,125 @@
+# /simulation/scheduler.py
+import numpy as np
+from config import config
+from utils.profiling import get_profiler
+from utils.surrogate import logit
+
+
+class UniformScheduler:
+    """Every node gets config.max_generations every round (the original behaviour)."""
+
+    def __init__(self, clusters):
+        self.clusters = clusters
+        self.nodes = [node for _, nodes in clusters for node in nodes]
+        self.budgets = {}
+        self.reseeds = 0
+
+    def plan(self, round_num):
+        """Generations for each node this round, keyed by global_id."""
+        return {node.global_id: config.max_generations for node in self.nodes}
+
+    def observe(self, round_num):
+        """Called once the round's evolutions are done, before supernode syncing."""
+
+    def get_state(self):
+        """What a resumed run needs to carry on where this one stopped (kept in the checkpoint manifest)."""
+        return {"reseeds": self.reseeds}
+
+    def set_state(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+
+class HalvingScheduler(UniformScheduler):
+    """
+    Shares each round's total budget (max_generations per node) by recent
+    progress, successive-halving style.
+
+    A node's improvement rate is the logit gain of its confidence history per
+    generation over the last round, smoothed across rounds. Nodes are ranked
+    by it; the top half forms tier 0, the next quarter tier 1, and so on, and
+    a tier-k node's share is halved k times. Every node keeps at least
+    scheduler_min_generations so a slow starter can still climb back. A node
+    stuck in the bottom half for scheduler_reseed_rounds rounds restarts from
+    its cluster's best solution.
+
+    The first round is uniform. Rates and bottom-half streaks are checkpointed,
+    so a resumed run plans exactly as it would have.
+    """
+
+    def __init__(self, clusters):
+        super().__init__(clusters)
+        self.rates = {}      # global_id -> smoothed logit gain per generation
+        self.starts = {}     # global_id -> history length when the round began
+        self.low_rounds = {node.global_id: 0 for node in self.nodes}
+
+    def plan(self, round_num):
+        self.starts = {node.global_id: len(node.confidence_progress) for node in self.nodes}
+        if len(self.rates) < len(self.nodes):
+            self.budgets = super().plan(round_num)
+            return self.budgets
+
+        ranked = sorted(self.nodes, key=lambda node: self.rates[node.global_id], reverse=True)
+        n = len(ranked)
+        # Rank r falls in tier k when it is past the top n/2 + n/4 + ... (k terms)
+        tiers = np.floor(-np.log2(1 - np.arange(n) / n)).astype(int)
+        weights = 0.5 ** tiers
+
+        total = config.max_generations * n
+        floor = min(config.scheduler_min_generations, config.max_generations)
+        extra = total - floor * n
+        budgets = floor + np.floor(extra * weights / weights.sum()).astype(int)
+        budgets[:total - budgets.sum()] += 1  # hand the rounding remainder to the leaders
+
+        self.budgets = {node.global_id: int(b) for node, b in zip(ranked, budgets)}
+        for node, tier in zip(ranked, tiers):
+            low = tier > 0
+            self.low_rounds[node.global_id] = self.low_rounds[node.global_id] + 1 if low else 0
+        get_profiler().count("scheduler_generations_moved", int(np.abs(budgets - config.max_generations).sum()) // 2)
+        return self.budgets
+
+    def get_state(self):
+        return dict(super().get_state(), rates=self.rates, low_rounds=self.low_rounds)
+
+    def observe(self, round_num):
+        for node in self.nodes:
+            curve = node.confidence_progress.read(self.starts.get(node.global_id, 0))
+            if curve.size == 0:
+                continue  # cancelled before it ran; keep the old estimate
+            # The curve holds the population's best before each generation; add where it ended
+            gain = logit(node.fitness.max()) - logit(float(curve[0]))
+            rate = gain / curve.size
+            previous = self.rates.get(node.global_id)
+            self.rates[node.global_id] = rate if previous is None else (
+                config.scheduler_smoothing * rate + (1 - config.scheduler_smoothing) * previous
+            )
+
+        if config.scheduler_reseed_rounds:
+            for supernode, nodes in self.clusters:
+                best = supernode.get_best_node()
+                for node in nodes:
+                    if (
+                        self.low_rounds[node.global_id] >= config.scheduler_reseed_rounds
+                        and best is not node and best.best_solution is not None
+                        and best.best_fitness > node.fitness.max()
+                    ):
+                        node.reseed(best.best_solution, best.best_fitness)
+                        self.low_rounds[node.global_id] = 0
+                        # Optimistic restart: the new seed is ranked with the leaders until it shows its rate
+                        self.rates[node.global_id] = max(self.rates.values())
+                        self.reseeds += 1
+                        get_profiler().count("scheduler_reseeds")
+                        print(f"🌱 {node.global_id} reseeded from {best.global_id} (conf={best.best_fitness:.4f})")
+
+
+SCHEDULERS = {
+    "uniform": UniformScheduler,
+    "halving": HalvingScheduler,
+}
+
+
+def make_scheduler(clusters, kind=None):
+    kind = kind or config.scheduler
+    if kind not in SCHEDULERS:
+        raise ValueError(f"Unknown scheduler: {kind}")
+    return SCHEDULERS[kind](clusters)
@@ -0,0 +1,159 @@
+# /simulation/topology.py
+import random
+
+import numpy as np
+from config import config
+
+
+def _ring_offsets(k):
+    """+1, -1, +2, -2, ... truncated to k entries."""
+    return [sign * step for step in range(1, k // 2 + 2) for sign in (1, -1)][:k]
+
+
+def random_neighbors(n, k, rng):
+    """k distinct random neighbors per node (the original topology)."""
+    neighbors = np.empty((n, k), dtype=np.int32)
+    for i in range(n):
+        # Sample from the n-1 other nodes without materializing them
+        neighbors[i] = [j + (j >= i) for j in rng.sample(range(n - 1), k)]
+    return neighbors
+
+
+def ring_neighbors(n, k, rng=None):
+    """Each node links to its k nearest nodes on a ring."""
+    return ((np.arange(n)[:, np.newaxis] + _ring_offsets(k)) % n).astype(np.int32)
+
+
+def _permutation_links(n, k, rng):
+    """
+    k links per node, slot by slot from random permutations of the nodes.
+    Each slot's permutation is repaired by swaps until no node links to
+    itself or repeats an earlier link; a swap with j is only taken when it
+    is valid for j too. A slot that gets stuck is redrawn.
+    """
+    links = [set() for _ in range(n)]
+    for _ in range(k):
+        while True:
+            perm = rng.sample(range(n), n)
+            if _repair_permutation(perm, links, rng):
+                break
+        for i, j in enumerate(perm):
+            links[i].add(j)
+    return links
+
+
+def _repair_permutation(perm, links, rng):
+    n = len(perm)
+    for i in range(n):
+        tries = 0
+        while perm[i] == i or perm[i] in links[i]:
+            tries += 1
+            if tries > n:
+                return False
+            j = rng.randrange(n)
+            a, b = perm[i], perm[j]
+            if b != i and b not in links[i] and a != j and a not in links[j]:
+                perm[i], perm[j] = b, a
+    return True
+
+
+def k_regular_neighbors(n, k, rng):
+    """
+    Random k-regular digraph. Each of the k slots is a random permutation
+    without self-loops or repeated links, so every node gets one out- and one
+    in-link per slot. Above half density the complement is drawn instead,
+    which keeps the swap repairs cheap.
+    """
+    if 2 * k <= n - 1:
+        links = _permutation_links(n, k, rng)
+        rows = [rng.sample(sorted(row), k) for row in links]
+    else:
+        absent = _permutation_links(n, n - 1 - k, rng)
+        rows = [rng.sample([j for j in range(n) if j != i and j not in absent[i]], k) for i in range(n)]
+    return np.array(rows, dtype=np.int32).reshape(n, k)
+
+
+def small_world_neighbors(n, k, rng):
+    """Watts-Strogatz style: a ring whose links are rewired to random nodes with probability rewire_probability."""
+    neighbors = ring_neighbors(n, k)
+    if k >= n - 1:
+        return neighbors  # already complete, nothing to rewire to
+    for i in range(n):
+        for slot in range(k):
+            if rng.random() < config.rewire_probability:
+                target = rng.randrange(n)
+                while target == i or target in neighbors[i]:
+                    target = rng.randrange(n)
+                neighbors[i, slot] = target
+    return neighbors
+
+
+NODE_TOPOLOGIES = {
+    "random": random_neighbors,
+    "ring": ring_neighbors,
+    "k_regular": k_regular_neighbors,
+    "small_world": small_world_neighbors,
+}
+
+
+def supernode_peers(n, kind, branching=2):
+    """
+    Peer lists of n supernodes as CSR arrays (indptr, indices): peers of
+    supernode i are indices[indptr[i]:indptr[i + 1]].
+    "full" links every pair, "ring" each to its two ring neighbours, and
+    "tree" each to its parent and children in a `branching`-ary tree.
+    """
+    if kind == "full":
+        peers = [[j for j in range(n) if j != i] for i in range(n)]
+    elif kind == "ring":
+        peers = [sorted({(i + 1) % n, (i - 1) % n} - {i}) for i in range(n)]
+    elif kind == "tree":
+        peers = [
+            ([(i - 1) // branching] if i > 0 else []) + list(range(branching * i + 1, min(branching * (i + 1) + 1, n)))
+            for i in range(n)
+        ]
+    else:
+        raise ValueError(f"Unknown supernode topology: {kind}")
+
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(p) for p in peers])
+    indices = np.array([j for p in peers for j in p], dtype=np.int32)
+    return indptr, indices
+
+
+class Topology:
+    """
+    Who talks to whom, as compact integer arrays.
+
+    node_neighbors[c] is an (n_c, k) int32 array of local node indices within
+    cluster c; supernode peers are CSR arrays over cluster indices. Every
+    generator runs in O(n * k).
+    """
+
+    def __init__(self, node_neighbors, peer_indptr, peer_indices, node_kind, supernode_kind):
+        self.node_neighbors = node_neighbors
+        self.peer_indptr = peer_indptr
+        self.peer_indices = peer_indices
+        self.node_kind = node_kind
+        self.supernode_kind = supernode_kind
+
+    @classmethod
+    def build(cls, cluster_sizes, k, node_kind=None, supernode_kind=None, seed=None):
+        node_kind = node_kind or config.node_topology
+        supernode_kind = supernode_kind or config.supernode_topology
+        if node_kind not in NODE_TOPOLOGIES:
+            raise ValueError(f"Unknown node topology: {node_kind}")
+
+        rng = random.Random(seed)
+        node_neighbors = [
+            NODE_TOPOLOGIES[node_kind](n, min(k, n - 1), rng) if n > 1 else np.empty((n, 0), dtype=np.int32)
+            for n in cluster_sizes
+        ]
+        indptr, indices = supernode_peers(len(cluster_sizes), supernode_kind, config.supernode_branching)
+        return cls(node_neighbors, indptr, indices, node_kind, supernode_kind)
+
+    def peers(self, cluster_id):
+        return self.peer_indices[self.peer_indptr[cluster_id]:self.peer_indptr[cluster_id + 1]]
+
+    def num_node_edges(self):
+        return sum(neighbors.size for neighbors in self.node_neighbors)
@@ -0,0 +1,181 @@
+# /simulation/topology_export.py
+import os
+import threading
+
+import numpy as np
+from config import config
+from config.paths import get_experiment_root
+from utils.profiling import get_profiler
+
+
+def _node_label(cluster_id, local_id):
+    return f"C{cluster_id}-N{local_id}"
+
+
+def iter_edges(topology):
+    """Yield (source, target, kind) for every link: neighbor (node->node), member (supernode->node), peer."""
+    for cluster_id, neighbors in enumerate(topology.node_neighbors):
+        supernode = f"S{cluster_id}"
+        for local_id, row in enumerate(neighbors.tolist()):
+            source = _node_label(cluster_id, local_id)
+            yield supernode, source, "member"
+            for target in row:
+                yield source, _node_label(cluster_id, target), "neighbor"
+        for peer in topology.peers(cluster_id).tolist():
+            yield supernode, f"S{peer}", "peer"
+
+
+def write_edge_list(topology, path):
+    with open(path, "w") as f:
+        f.write("source,target,kind\n")
+        f.writelines(f"{source},{target},{kind}\n" for source, target, kind in iter_edges(topology))
+
+
+def write_graphml(topology, path):
+    """Stream the topology as GraphML without building an in-memory graph."""
+    with open(path, "w") as f:
+        f.write(
+            '<?xml version="1.0" encoding="UTF-8"?>\n'
+            '<graphml xmlns="http://graphml.graphdrawing.org/xmlns">\n'
+            '  <key id="role" for="node" attr.name="role" attr.type="string"/>\n'
+            '  <key id="cluster" for="node" attr.name="cluster" attr.type="int"/>\n'
+            '  <key id="kind" for="edge" attr.name="kind" attr.type="string"/>\n'
+            '  <graph id="topology" edgedefault="directed">\n'
+        )
+        for cluster_id, neighbors in enumerate(topology.node_neighbors):
+            f.write(
+                f'    <node id="S{cluster_id}"><data key="role">supernode</data>'
+                f'<data key="cluster">{cluster_id}</data></node>\n'
+            )
+            f.writelines(
+                f'    <node id="{_node_label(cluster_id, local_id)}"><data key="role">node</data>'
+                f'<data key="cluster">{cluster_id}</data></node>\n'
+                for local_id in range(len(neighbors))
+            )
+        f.writelines(
+            f'    <edge source="{source}" target="{target}"><data key="kind">{kind}</data></edge>\n'
+            for source, target, kind in iter_edges(topology)
+        )
+        f.write("  </graph>\n</graphml>\n")
+
+
+def _supernode_positions(n_clusters, radius=10):
+    angles = 2 * np.pi * np.arange(n_clusters) / max(n_clusters, 1)
+    return np.column_stack([radius * np.cos(angles), radius * np.sin(angles)])
+
+
+def _peer_segments(topology, positions):
+    return [
+        (positions[i], positions[j])
+        for i in range(len(topology.node_neighbors)) for j in topology.peers(i).tolist() if i < j
+    ]
+
+
+def _draw_detailed(ax, topology):
+    """Every node: supernodes (red) on a ring, each cluster (skyblue) on a small ring around its supernode."""
+    from matplotlib.collections import LineCollection
+
+    centers = _supernode_positions(len(topology.node_neighbors))
+    cluster_radius = 3
+    segments = {"neighbor": [], "member": [], "peer": _peer_segments(topology, centers)}
+    labels = []
+    node_xy = []
+    for cluster_id, neighbors in enumerate(topology.node_neighbors):
+        n_nodes = len(neighbors)
+        angles = 2 * np.pi * np.arange(n_nodes) / max(n_nodes, 1)
+        xy = centers[cluster_id] + cluster_radius * np.column_stack([np.cos(angles), np.sin(angles)])
+        node_xy.append(xy)
+        labels.extend((_node_label(cluster_id, j), xy[j]) for j in range(n_nodes))
+        segments["member"].extend((centers[cluster_id], point) for point in xy)
+        segments["neighbor"].extend((xy[i], xy[j]) for i, row in enumerate(neighbors.tolist()) for j in row)
+
+    for kind, color in (("member", "gray"), ("neighbor", "black"), ("peer", "magenta")):
+        ax.add_collection(LineCollection(segments[kind], colors=color, linewidths=1, zorder=1))
+    if node_xy:
+        node_xy = np.concatenate(node_xy)
+        ax.scatter(node_xy[:, 0], node_xy[:, 1], s=1000, c="skyblue", zorder=2)
+    ax.scatter(centers[:, 0], centers[:, 1], s=1000, c="red", zorder=2)
+    labels.extend((f"S{i}", center) for i, center in enumerate(centers))
+    for label, (x, y) in labels:
+        ax.text(x, y, label, fontsize=8, ha="center", va="center", zorder=3)
+
+
+def _draw_aggregated(ax, topology):
+    """One marker per cluster, sized by node count and labelled with its intra-cluster stats."""
+    from matplotlib.collections import LineCollection
+
+    centers = _supernode_positions(len(topology.node_neighbors))
+    sizes = np.array([len(neighbors) for neighbors in topology.node_neighbors])
+    ax.add_collection(LineCollection(_peer_segments(topology, centers), colors="magenta", linewidths=0.5, zorder=1))
+    # Markers shrink as more clusters share the ring; colour shows cluster size
+    crowding = min(1.0, 12 / max(len(centers), 1)) ** 2
+    points = ax.scatter(
+        centers[:, 0], centers[:, 1], s=(200 + 800 * sizes / max(sizes.max(), 1)) * crowding,
+        c=sizes, cmap="autumn", zorder=2,
+    )
+    ax.figure.colorbar(points, ax=ax, shrink=0.6, label="nodes per cluster")
+    if len(centers) <= 50:  # beyond this the labels just overlap
+        for cluster_id, (x, y) in enumerate(centers):
+            neighbors = topology.node_neighbors[cluster_id]
+            ax.text(
+                x, y, f"S{cluster_id}\n{len(neighbors)} nodes\n{neighbors.size} links",
+                fontsize=7, ha="center", va="center", zorder=3,
+            )
+
+
+def render_topology(topology, path, max_nodes=None):
+    """
+    Plot the topology to `path`. Up to `max_nodes` nodes every node is drawn;
+    above that only supernodes with per-cluster stats. Uses matplotlib's
+    object API, so it is safe to call off the main thread.
+    """
+    from matplotlib.figure import Figure
+
+    max_nodes = config.topology_plot_max_nodes if max_nodes is None else max_nodes
+    total_nodes = sum(len(neighbors) for neighbors in topology.node_neighbors)
+
+    fig = Figure(figsize=(12, 8))
+    ax = fig.add_subplot()
+    if total_nodes <= max_nodes:
+        _draw_detailed(ax, topology)
+        ax.set_title("Distributed System Topology: True Clusters & Supernodes")
+    else:
+        _draw_aggregated(ax, topology)
+        ax.set_title(
+            f"Cluster-level topology: {len(topology.node_neighbors)} supernodes, "
+            f"{total_nodes} nodes, {topology.num_node_edges()} neighbor links ({topology.node_kind})"
+        )
+    ax.set_aspect("equal")
+    ax.autoscale_view()
+    ax.margins(0.1)
+    ax.axis("off")
+    fig.tight_layout()
+    fig.savefig(path)
+
+
+def export_topology(topology, directory=None):
+    """Write topology_edges.csv, topology.graphml and (unless headless) topology.png under `directory`."""
+    directory = directory or get_experiment_root()
+    os.makedirs(directory, exist_ok=True)
+    with get_profiler().phase("topology_export"):
+        write_edge_list(topology, os.path.join(directory, "topology_edges.csv"))
+        write_graphml(topology, os.path.join(directory, "topology.graphml"))
+        if not config.headless:
+            render_topology(topology, os.path.join(directory, "topology.png"))
+    print(f"✅ Topology exported to {directory}")
+
+
+def _export_in_background(topology, directory):
+    try:
+        export_topology(topology, directory)
+    except Exception as exc:  # a failed export must never take the run down
+        print(f"⚠️ Topology export failed: {exc}")
+
+
+def start_topology_export(topology, directory=None):
+    """Export on a background thread; join the returned thread before exiting."""
+    thread = threading.Thread(
+        target=_export_in_background, args=(topology, directory), name="topology-export", daemon=True
+    )
+    thread.start()
+    return thread
@@ -0,0 +1,112 @@
+# /tests/test_fast_paths.py
+import os
+import sys
+import warnings
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_digits
+from sklearn.neural_network import MLPClassifier
+from sklearn.svm import SVC
+
+from config import config
+from utils.incremental import MLPIncremental, SVCIncremental
+from utils.mutation import mutate_batch
+from utils.svm_fast import SVCEvaluator
+
+TOLERANCE = 1e-9
+
+
+@pytest.fixture(scope="module")
+def digits():
+    data = load_digits()
+    rng = np.random.RandomState(0)
+    train = rng.choice(len(data.target), 600, replace=False)
+    candidates = data.images[rng.choice(len(data.target), 40, replace=False)].astype(np.uint8)
+    return data.data[train], data.target[train], candidates
+
+
+def _fit(model, X, y):
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return model.fit(X, y)
+
+
+def _children(images, mutation_rate, seed, monkeypatch):
+    monkeypatch.setattr(config, "pixel_max", 16)
+    return mutate_batch(images, mutation_rate, max_delta=3, rng=np.random.RandomState(seed))
+
+
+def _features(images):
+    return images.reshape(len(images), -1).astype(np.float64)
+
+
+@pytest.fixture(scope="module", params=["rbf", "linear", "poly", "sigmoid"])
+def svc(request, digits):
+    X, y, _ = digits
+    return _fit(SVC(kernel=request.param, probability=True, decision_function_shape="ovo", random_state=0), X, y)
+
+
+def test_svc_evaluator_matches_sklearn(svc, digits):
+    features = _features(digits[2])
+    evaluator = SVCEvaluator(svc)
+
+    np.testing.assert_allclose(evaluator.decision_function(features), svc.decision_function(features), atol=TOLERANCE)
+    np.testing.assert_allclose(evaluator.predict_proba(features), svc.predict_proba(features), atol=TOLERANCE)
+
+
+def test_svc_target_margin_is_worst_signed_ovo_decision(svc, digits):
+    features = _features(digits[2])
+    evaluator = SVCEvaluator(svc)
+    decision = svc.decision_function(features)
+
+    for target in range(evaluator.n_classes):
+        columns = [p for p, pair in enumerate(evaluator.pairs) if target in pair]
+        signs = np.array([1.0 if evaluator.pairs[p][0] == target else -1.0 for p in columns])
+        expected = 1 / (1 + np.exp(-(decision[:, columns] * signs).min(axis=1)))
+        np.testing.assert_allclose(evaluator.target_margin(features, target), expected, atol=TOLERANCE)
+
+
+# Few changed pixels take the sparse update, many the dense one
+@pytest.mark.parametrize("mutation_rate", [0.02, 0.5])
+def test_svc_incremental_matches_full_rescore(svc, digits, mutation_rate, monkeypatch):
+    parents = digits[2]
+    incremental = SVCIncremental(SVCEvaluator(svc))
+    state = incremental.initial(_features(parents))
+
+    # Chained over several generations, as a node does within a round
+    for generation in range(5):
+        children = _children(parents, mutation_rate, generation, monkeypatch)
+        state = incremental.update(state, _features(parents), _features(children))
+        parents = children
+
+    features = _features(parents)
+    np.testing.assert_allclose(state, incremental.initial(features), atol=1e-6)
+    for mode in ("probability", "margin"):
+        expected = (
+            svc.predict_proba(features)[:, 3] if mode == "probability"
+            else incremental.evaluator.target_margin(features, 3)
+        )
+        np.testing.assert_allclose(incremental.score(state, 3, mode), expected, atol=TOLERANCE)
+
+
+@pytest.mark.parametrize("activation", ["relu", "tanh", "logistic"])
+@pytest.mark.parametrize("binary", [False, True])
+@pytest.mark.parametrize("mutation_rate", [0.02, 0.5])
+def test_mlp_incremental_matches_full_rescore(digits, activation, binary, mutation_rate, monkeypatch):
+    X, y, parents = digits
+    if binary:
+        y = (y == 3).astype(int)  # logistic output layer
+    mlp = _fit(MLPClassifier(hidden_layer_sizes=(32, 16), activation=activation, max_iter=200, random_state=0), X, y)
+    incremental = MLPIncremental(mlp)
+    state = incremental.initial(_features(parents))
+
+    for generation in range(5):
+        children = _children(parents, mutation_rate, generation, monkeypatch)
+        state = incremental.update(state, _features(parents), _features(children))
+        parents = children
+
+    features = _features(parents)
+    np.testing.assert_allclose(incremental.score(state, 1, "probability"), mlp.predict_proba(features)[:, 1], atol=TOLERANCE)
@@ -0,0 +1,63 @@
+# /tests/test_mutation.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+
+from config import config
+from utils.mutation import mutate_batch, pixel_dtype
+
+
+def reference_mutate_batch(images, mutation_rate, allow_repeats, max_delta, rng):
+    """The original per-pixel loop, fed the same hits and deltas mutate_batch draws from `rng`."""
+    images = np.array(images)
+    n_images, n_pixels = images.shape[0], images[0].size
+    num_mutations = int(mutation_rate * n_pixels)
+    if allow_repeats:
+        hits = rng.randint(0, n_pixels, size=(n_images, num_mutations))
+    else:
+        hits = np.argpartition(rng.random((n_images, n_pixels)), num_mutations - 1, axis=1)[:, :num_mutations]
+    deltas = rng.randint(-max_delta, max_delta + 1, size=(n_images, num_mutations))
+
+    for image, image_hits, image_deltas in zip(images, hits, deltas):
+        flat = image.reshape(-1)
+        for pixel, delta in zip(image_hits, image_deltas):
+            flat[pixel] = np.clip(int(flat[pixel]) + int(delta), 0, config.pixel_max)
+    return images
+
+
+@pytest.mark.parametrize("pixel_max", [16, 255, 1000])
+@pytest.mark.parametrize("mutation_rate", [0.05, 0.5, 3.0])
+@pytest.mark.parametrize("allow_repeats", [True, False])
+@pytest.mark.parametrize("max_delta", [1, 7])
+def test_mutate_batch_matches_per_pixel_loop(monkeypatch, pixel_max, mutation_rate, allow_repeats, max_delta):
+    if not allow_repeats and mutation_rate > 1:
+        pytest.skip("distinct hits can't exceed the pixel count")
+    monkeypatch.setattr(config, "pixel_max", pixel_max)
+    setup = np.random.RandomState(0)
+    # Mostly saturated pixels, so clipping at both ends is exercised on every layer of repeat hits
+    images = setup.choice([0, 1, pixel_max - 1, pixel_max], size=(6, 8, 8)).astype(pixel_dtype(pixel_max))
+
+    expected = reference_mutate_batch(images, mutation_rate, allow_repeats, max_delta, np.random.RandomState(42))
+    out = np.empty_like(images)
+    result = mutate_batch(
+        images, mutation_rate, out=out, allow_repeats=allow_repeats, max_delta=max_delta,
+        rng=np.random.RandomState(42),
+    )
+
+    assert result is out
+    assert result.dtype == images.dtype
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_mutate_batch_in_place(monkeypatch):
+    monkeypatch.setattr(config, "pixel_max", 255)
+    images = np.random.RandomState(1).randint(0, 256, size=(4, 28, 28)).astype(np.uint8)
+    expected = mutate_batch(images, 0.5, rng=np.random.RandomState(3))
+
+    buffer = images.copy()
+    mutate_batch(buffer, 0.5, out=buffer, rng=np.random.RandomState(3))
+    np.testing.assert_array_equal(buffer, expected)
@@ -0,0 +1,54 @@
+# /tests/test_scheduler_resume.py
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import numpy as np
+import pytest
+from sklearn.datasets import load_digits
+from sklearn.svm import SVC
+
+from config import config
+from simulation.run_simulation import run_simulation
+
+
+@pytest.fixture
+def digits_config(monkeypatch):
+    values = dict(
+        dataset_name="digits", model_name="SVM", image_height=8, image_width=8, pixel_max=16,
+        clusters=2, nodes_per_cluster=4, max_generations=20, target_confidence=0.9999, seed=7,
+        num_workers=1, headless=True, checkpoint_interval=1, snapshot_interval=0, export_topology=False,
+        scheduler="halving", scheduler_min_generations=5, scheduler_reseed_rounds=1,
+    )
+    for key, value in values.items():
+        monkeypatch.setattr(config, key, value)
+    digits = load_digits()
+    return SVC(probability=True, random_state=0).fit(digits.data, digits.target)
+
+
+def _final_states(clusters):
+    return {node.global_id: node.get_state() for _, nodes in clusters for node in nodes}
+
+
+def test_halving_resume_matches_uninterrupted_run(digits_config, tmp_path, monkeypatch):
+    model = digits_config
+
+    os.makedirs(tmp_path / "full", exist_ok=True)
+    os.makedirs(tmp_path / "resumed", exist_ok=True)
+
+    monkeypatch.chdir(tmp_path / "full")
+    monkeypatch.setattr(config, "max_rounds", 6)
+    expected = _final_states(run_simulation(model, 0))
+
+    monkeypatch.chdir(tmp_path / "resumed")
+    monkeypatch.setattr(config, "max_rounds", 3)
+    run_simulation(model, 0)
+    monkeypatch.setattr(config, "max_rounds", 6)
+    resumed = _final_states(run_simulation(model, 0, resume=True))
+
+    assert resumed.keys() == expected.keys()
+    for global_id, state in expected.items():
+        assert resumed[global_id]["generation"] == state["generation"], global_id
+        assert resumed[global_id]["best_fitness"] == state["best_fitness"], global_id
+        np.testing.assert_array_equal(resumed[global_id]["population"], state["population"])
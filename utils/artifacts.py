@@ -0,0 +1,174 @@
+# /utils/artifacts.py
+import glob
+import os
+import queue
+import sys
+import threading
+from collections import defaultdict
+
+import numpy as np
+from config import config
+from config.paths import get_experiment_root
+from utils.profiling import get_profiler
+
+
+class ArtifactWriter:
+    """
+    Records evolved-image snapshots and confidence curves on a background thread.
+
+    Nothing is rendered during the run: records are grouped per round and
+    written as compressed .npz chunks (R{round}/snapshots_{pid}_{k}.npz) under
+    the experiment root. PNGs are produced afterwards by `export_pngs`.
+    """
+
+    def __init__(self, base_dir=None, chunk_size=None):
+        self.base_dir = base_dir or get_experiment_root()
+        self.chunk_size = chunk_size or config.snapshot_chunk_size
+        self.tag = str(os.getpid())
+        self.queue = queue.Queue()
+        self.pending = defaultdict(lambda: {"snapshots": [], "curves": {}})
+        self.chunks_written = defaultdict(int)
+        self.bytes_written = 0
+        self.thread = threading.Thread(target=self._run, name="artifact-writer", daemon=True)
+        self.thread.start()
+
+    def record_snapshot(self, node_id, image, gen, confidence, round_num=None):
+        # Copy now: callers reuse their image buffers
+        self.queue.put(("snapshot", round_num, (node_id, gen, float(confidence), np.array(image))))
+
+    def record_curve(self, node_id, progress, round_num=None):
+        self.queue.put(("curve", round_num, (node_id, np.asarray(progress, dtype=np.float32))))
+
+    def flush(self, wait=False):
+        """Write everything buffered so far; with wait=True, block until it is on disk."""
+        self.queue.put(("flush", None, None))
+        if wait:
+            self.queue.join()
+
+    def close(self):
+        self.queue.put(("close", None, None))
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            kind, round_num, payload = self.queue.get()
+            try:
+                if kind == "snapshot":
+                    buffered = self.pending[round_num]
+                    buffered["snapshots"].append(payload)
+                    if len(buffered["snapshots"]) >= self.chunk_size:
+                        self._write_round(round_num)
+                elif kind == "curve":
+                    node_id, progress = payload
+                    self.pending[round_num]["curves"][node_id] = progress
+                elif kind in ("flush", "close"):
+                    for pending_round in list(self.pending):
+                        self._write_round(pending_round)
+                    if kind == "close":
+                        return
+            finally:
+                self.queue.task_done()
+
+    def _write_round(self, round_num):
+        buffered = self.pending.pop(round_num, None)
+        if not buffered or not (buffered["snapshots"] or buffered["curves"]):
+            return
+
+        output_dir = self.base_dir if round_num is None else os.path.join(self.base_dir, f"R{round_num}")
+        os.makedirs(output_dir, exist_ok=True)
+        chunk = self.chunks_written[round_num]
+        self.chunks_written[round_num] += 1
+        path = os.path.join(output_dir, f"snapshots_{self.tag}_{chunk:04d}.npz")
+
+        arrays = {f"curve:{node_id}": curve for node_id, curve in buffered["curves"].items()}
+        if buffered["snapshots"]:
+            node_ids, gens, confidences, images = zip(*buffered["snapshots"])
+            arrays.update(
+                node_ids=np.array(node_ids),
+                generations=np.array(gens, dtype=np.int64),
+                confidences=np.array(confidences, dtype=np.float32),
+                images=np.stack(images),
+            )
+        np.savez_compressed(path, **arrays)
+        size = os.path.getsize(path)
+        self.bytes_written += size
+        get_profiler().count("artifact_bytes_written", size)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_artifact_writer():
+    """Process-wide writer, started on first use."""
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ArtifactWriter()
+        return _writer
+
+
+def close_artifact_writer():
+    """Flush and stop the process-wide writer, if one was started."""
+    global _writer
+    with _writer_lock:
+        if _writer is not None:
+            _writer.close()
+            _writer = None
+
+
+def load_snapshots(experiment_dir=None):
+    """
+    Yield (round_dir, data) for every snapshot chunk under the experiment root,
+    where data is the loaded .npz mapping.
+    """
+    experiment_dir = experiment_dir or get_experiment_root()
+    pattern = os.path.join(experiment_dir, "**", "snapshots_*.npz")
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        with np.load(path) as data:
+            yield os.path.dirname(path), {key: data[key] for key in data.files}
+
+
+def export_pngs(experiment_dir=None):
+    """Render the recorded snapshots and curves to PNGs, in the per-node layout of earlier runs."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    count = 0
+    for round_dir, data in load_snapshots(experiment_dir):
+        if "images" in data:
+            for node_id, gen, confidence, image in zip(
+                data["node_ids"], data["generations"], data["confidences"], data["images"]
+            ):
+                output_dir = os.path.join(round_dir, str(node_id))
+                os.makedirs(output_dir, exist_ok=True)
+                plt.imshow(image, cmap='gray')
+                plt.title(f"{node_id} - Gen {gen} - Conf: {confidence:.4f}")
+                plt.axis('off')
+                plt.savefig(os.path.join(output_dir, f"{node_id}_gen_{gen}.png"))
+                plt.close()
+                count += 1
+
+        for key in data:
+            if not key.startswith("curve:"):
+                continue
+            node_id = key[len("curve:"):]
+            output_dir = os.path.join(round_dir, node_id)
+            os.makedirs(output_dir, exist_ok=True)
+            plt.plot(data[key], label=node_id)
+            plt.xlabel("Generation")
+            plt.ylabel("Confidence")
+            plt.title(f"Confidence Progress - {node_id}")
+            plt.legend()
+            plt.savefig(os.path.join(output_dir, f"{node_id}_confidence.png"))
+            plt.close()
+            count += 1
+
+    print(f"✅ Exported {count} PNGs")
+    return count
+
+
+if __name__ == "__main__":
+    # python -m utils.artifacts [experiment_dir]
+    export_pngs(sys.argv[1] if len(sys.argv) > 1 else None)
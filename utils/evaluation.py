@@ -1,16 +1,133 @@
 import numpy as np
-import pandas as pd
+from config import config
+from utils.profiling import get_profiler
+from utils.svm_fast import get_svc_evaluator
+
+
+class FeatureBuffer:
+    """
+    Reusable float64 scratch for turning (N, H, W) pixel stacks into feature
+    rows. It grows to the largest batch seen; each convert() overwrites the
+    rows returned by the previous one.
+    """
+
+    def __init__(self):
+        self.array = None
+
+    def convert(self, images):
+        images = np.asarray(images)
+        flat = images.reshape(images.shape[0], -1)
+        if self.array is None or self.array.shape[0] < flat.shape[0] or self.array.shape[1] != flat.shape[1]:
+            self.array = np.empty(flat.shape, dtype=np.float64)
+        features = self.array[:flat.shape[0]]
+        np.copyto(features, flat)
+        return features
+
+
+def float_features(images, buffer=None):
+    """(N, H*W) float64 rows of an image stack, written into `buffer` (a FeatureBuffer) when given."""
+    if buffer is not None:
+        return buffer.convert(images)
+    images = np.asarray(images)
+    return images.reshape(images.shape[0], -1).astype(np.float64)
 
-def evaluate_fitness(image, model, target_class):
-    image_flat = image.flatten().reshape(1, -1)
 
-    # If model was trained with column names
+def _as_feature_matrix(images, model, buffer=None):
+    """Flatten an (N, H, W) stack into the (N, H*W) layout the model was trained on."""
+    images = np.asarray(images)
+    if getattr(model, "takes_raw_pixels", False):
+        # Inference server clients ship the narrow pixels; the server converts them
+        return images.reshape(images.shape[0], -1)
+    # Converting to float64 here spares sklearn its own copy of the batch
+    features = float_features(images, buffer)
+
+    # If model was trained with column names, wrap the whole batch once
     if hasattr(model, 'feature_names_in_'):
-        feature_names = model.feature_names_in_
-        df = pd.DataFrame(image_flat, columns=feature_names)
-        confidence = model.predict_proba(df)[0][target_class]
-    else:
-        # fallback
-        confidence = model.predict_proba(image_flat)[0][target_class]
-
-    return confidence
+        import pandas as pd  # only models fitted on DataFrames need it
+        return pd.DataFrame(features, columns=model.feature_names_in_, copy=False)
+    return features
+
+
+def _fast_evaluator(model, mode, batch_size):
+    """The SVC fast-path evaluator to use for this call, or None for plain predict_proba."""
+    if not config.svm_fast_path:
+        return None
+    evaluator = get_svc_evaluator(model)
+    if evaluator is None:
+        return None
+    if mode == "margin":
+        return evaluator
+    # Coupling in numpy only beats libsvm once the batch is big enough
+    if evaluator.has_probability and batch_size >= config.svm_fast_min_batch:
+        return evaluator
+    return None
+
+
+def scores_are_probabilities(model, mode="probability"):
+    """False when evaluate_batch(mode=...) returns SVC margin scores rather than confidences."""
+    return mode != "margin" or not config.svm_fast_path or get_svc_evaluator(model) is None
+
+
+def evaluate_batch(images, model, target_class, cache=None, mode="probability", exact=False, buffer=None):
+    """
+    Score a stack of candidate images with a single predict_proba call.
+    Returns a float array of target-class confidences, one per image.
+    With a FitnessCache, only images not seen before reach the model.
+
+    For fitted SVCs the vectorized fast path (utils.svm_fast) is used, giving
+    the same probabilities as libsvm. mode="margin" scores SVCs by the squashed
+    target-class margin instead (other models fall back to probabilities), and
+    exact=True always goes through the model's own predict_proba. Pass a
+    FeatureBuffer to convert pixels to features without allocating.
+    """
+    images = np.asarray(images)
+    if images.shape[0] == 0:
+        return np.empty(0, dtype=float)
+
+    if cache is None:
+        profiler = get_profiler()
+        profiler.count("model_calls")
+        profiler.count("images_scored", images.shape[0])
+
+        evaluator = None if exact else _fast_evaluator(model, mode, images.shape[0])
+        if evaluator is not None:
+            features = float_features(images, buffer)
+            if mode == "margin":
+                return evaluator.target_margin(features, target_class)
+            return evaluator.predict_proba(features)[:, target_class]
+
+        probabilities = model.predict_proba(_as_feature_matrix(images, model, buffer))
+        return probabilities[:, target_class]
+
+    if mode != "probability":
+        raise ValueError("The fitness cache only holds probabilities.")
+
+    keys = [cache.make_key(image, model, target_class) for image in images]
+    scores = np.array([cache.get(key) for key in keys], dtype=float)  # None -> nan
+    missing = np.flatnonzero(np.isnan(scores))
+    if missing.size:
+        scores[missing] = evaluate_batch(images[missing], model, target_class, exact=exact, buffer=buffer)
+        for i in missing:
+            cache.put(keys[i], scores[i])
+    return scores
+
+
+def evaluate_all_classes(images, model):
+    """
+    Probabilities of every class for a stack of images, (N, n_classes), from
+    one predict_proba call (or the SVC fast path for large enough batches).
+    """
+    images = np.asarray(images)
+    profiler = get_profiler()
+    profiler.count("model_calls")
+    profiler.count("images_scored", images.shape[0])
+
+    evaluator = _fast_evaluator(model, "probability", images.shape[0])
+    if evaluator is not None:
+        return evaluator.predict_proba(float_features(images))
+    return model.predict_proba(_as_feature_matrix(images, model))
+
+
+def evaluate_fitness(image, model, target_class):
+    image = np.asarray(image)
+    return evaluate_batch(image[np.newaxis], model, target_class)[0]
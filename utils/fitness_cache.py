@@ -0,0 +1,72 @@
+# /utils/fitness_cache.py
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from config import config
+from utils.profiling import get_profiler
+
+
+class FitnessCache:
+    """
+    Bounded LRU map from (image content, model, target class) to confidence.
+    Images are keyed by a hash of their bytes, shape and dtype, so equal
+    pixels arriving as different array objects still hit.
+    """
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries or config.fitness_cache_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_key(image, model, target_class):
+        image = np.ascontiguousarray(image)
+        digest = hashlib.blake2b(image.view(np.uint8).reshape(-1), digest_size=16)
+        digest.update(f"{image.shape}{image.dtype.str}".encode())
+        return digest.digest(), id(model), int(target_class)
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                get_profiler().count("cache_hits")
+                return self.entries[key]
+            self.misses += 1
+            get_profiler().count("cache_misses")
+            return None
+
+    def put(self, key, fitness):
+        with self.lock:
+            self.entries[key] = float(fitness)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def store(self, image, model, target_class, fitness):
+        """Record an already-known score so later lookups of this image are free."""
+        self.put(self.make_key(image, model, target_class), fitness)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(self.entries),
+        }
+
+
+_default_cache = None
+
+
+def get_fitness_cache():
+    """Process-wide cache shared by nodes, C&C and the summary."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FitnessCache()
+    return _default_cache
@@ -0,0 +1,131 @@
+# /utils/history.py
+import os
+
+import numpy as np
+from config import config
+from config.paths import get_experiment_root
+from utils.profiling import get_profiler
+
+HISTORY_DTYPE = np.float32
+
+
+def get_history_dir():
+    return os.path.join(get_experiment_root(), "history")
+
+
+class ConfidenceHistory:
+    """
+    Append-only float32 history of one node's per-generation confidence.
+
+    Values go into a preallocated buffer; when it fills up it is appended to
+    `path` as raw float32 and reused, so RAM per node stays at one buffer no
+    matter how long the run is. With path=None the buffer just grows instead
+    (used for short-lived worker copies).
+    """
+
+    def __init__(self, path=None, buffer_size=None):
+        self.path = path
+        self.buffer = np.empty(buffer_size or config.history_buffer_size, dtype=HISTORY_DTYPE)
+        self.buffered = 0
+        self.spilled = 0
+
+    def __len__(self):
+        return self.spilled + self.buffered
+
+    def append(self, value):
+        if self.buffered == self.buffer.size:
+            self._make_room()
+        self.buffer[self.buffered] = value
+        self.buffered += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=HISTORY_DTYPE).ravel()
+        while values.size:
+            if self.buffered == self.buffer.size:
+                self._make_room()
+            count = min(self.buffer.size - self.buffered, values.size)
+            self.buffer[self.buffered:self.buffered + count] = values[:count]
+            self.buffered += count
+            values = values[count:]
+
+    def _make_room(self):
+        if self.path is None:
+            self.buffer = np.resize(self.buffer, self.buffer.size * 2)
+        else:
+            self.flush()
+
+    def flush(self):
+        """Move buffered values to the on-disk file."""
+        if self.path is None or self.buffered == 0:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # First spill of this run truncates anything left by an earlier run
+        with open(self.path, "ab" if self.spilled else "wb") as f:
+            self.buffer[:self.buffered].tofile(f)
+        get_profiler().count("history_bytes_written", self.buffer[:self.buffered].nbytes)
+        self.spilled += self.buffered
+        self.buffered = 0
+
+    def resume(self, length):
+        """Continue an on-disk history from a checkpoint, dropping anything written after it."""
+        self.buffered = 0
+        self.spilled = length
+        if self.path is not None and os.path.exists(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(length * np.dtype(HISTORY_DTYPE).itemsize)
+
+    def read(self, start=0, stop=None):
+        """Values in [start, stop); spilled values are read through a memmap."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        start = min(start, stop)
+        parts = []
+        if start < self.spilled:
+            on_disk = np.memmap(self.path, dtype=HISTORY_DTYPE, mode="r", shape=(self.spilled,))
+            parts.append(np.array(on_disk[start:min(stop, self.spilled)]))
+        if stop > self.spilled:
+            parts.append(self.buffer[max(start - self.spilled, 0):stop - self.spilled].copy())
+        return np.concatenate(parts) if parts else np.empty(0, dtype=HISTORY_DTYPE)
+
+
+def node_history(node_id):
+    """Spilling history for a node, stored under the experiment root."""
+    return ConfidenceHistory(os.path.join(get_history_dir(), f"{node_id}.f32"))
+
+
+class HistoryReader:
+    """Read flushed node histories from disk without loading them all into RAM."""
+
+    def __init__(self, history_dir=None):
+        self.history_dir = history_dir or get_history_dir()
+
+    def node_ids(self):
+        if not os.path.isdir(self.history_dir):
+            return []
+        return sorted(name[:-len(".f32")] for name in os.listdir(self.history_dir) if name.endswith(".f32"))
+
+    def open(self, node_id):
+        """Read-only memmap over a node's full history."""
+        path = os.path.join(self.history_dir, f"{node_id}.f32")
+        # A node stopped before its first generation never spilled anything
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=HISTORY_DTYPE)
+        return np.memmap(path, dtype=HISTORY_DTYPE, mode="r")
+
+    def read(self, node_id, start=0, stop=None):
+        return np.array(self.open(node_id)[start:stop])
+
+    def downsample(self, node_id, max_points=2000):
+        """(generations, values) thinned to at most max_points, for plotting long runs."""
+        history = self.open(node_id)
+        step = max(1, -(-len(history) // max_points))
+        generations = np.arange(0, len(history), step)
+        return generations, np.array(history[::step])
+
+    def final_values(self):
+        """Last recorded confidence of every node."""
+        values = {}
+        for node_id in self.node_ids():
+            history = self.open(node_id)
+            if len(history):
+                values[node_id] = float(history[-1])
+        return values
@@ -0,0 +1,126 @@
+# /utils/incremental.py
+import threading
+
+import numpy as np
+from utils.svm_fast import get_svc_evaluator
+
+
+# Above this fraction of changed pixels a dense product beats gathering weight rows
+SPARSE_FRACTION = 0.05
+
+
+def linear_update(state, parent_features, child_features, weights_by_feature):
+    """
+    state + (child - parent) @ weights_by_feature, touching only the weight
+    rows of changed pixels when changes are sparse.
+    """
+    delta = child_features - parent_features
+    state = np.array(state)
+    rows, cols = np.nonzero(delta)
+    if rows.size > SPARSE_FRACTION * delta.size:
+        state += delta @ weights_by_feature
+    elif rows.size:
+        # np.nonzero is row-major, so each row's changes are contiguous
+        contributions = delta[rows, cols][:, np.newaxis] * weights_by_feature[cols]
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        state[rows[starts]] += np.add.reduceat(contributions, starts, axis=0)
+    return state
+
+
+class SVCIncremental:
+    """
+    Keeps each candidate's kernel inputs (squared distances to the support
+    vectors for RBF, dot products for the other kernels), so a mutant's are
+    its parent's plus a correction from the pixels it changed.
+    """
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+        self.kernel = evaluator.kernel
+        # Row j holds feature j's contribution to every support vector's kernel input:
+        # ||x' - s||^2 - ||x - s||^2 = sum_j (x'_j^2 - x_j^2) - 2 (x'_j - x_j) s_j
+        scale = -2.0 if self.kernel == "rbf" else 1.0
+        self.weights_by_feature = np.ascontiguousarray(scale * evaluator.support_vectors.T)
+
+    def initial(self, features):
+        return self.evaluator.kernel_inputs(features)
+
+    def update(self, parent_state, parent_features, child_features):
+        state = linear_update(parent_state, parent_features, child_features, self.weights_by_feature)
+        if self.kernel == "rbf":
+            state += np.einsum("ij,ij->i", child_features, child_features)[:, np.newaxis]
+            state -= np.einsum("ij,ij->i", parent_features, parent_features)[:, np.newaxis]
+        return state
+
+    def score(self, state, target_class, mode):
+        kernel = self.evaluator.kernel_from_inputs(state)
+        if mode == "margin":
+            return self.evaluator.margin_from_kernel(kernel, target_class)
+        return self.evaluator.proba_from_kernel(kernel)[:, target_class]
+
+
+class MLPIncremental:
+    """
+    Keeps each candidate's first-layer pre-activations, updated from the
+    changed pixels' weight rows; the (much smaller) remaining layers are run
+    as usual. Matches MLPClassifier.predict_proba.
+    """
+
+    def __init__(self, model):
+        from scipy.special import expit  # already loaded by sklearn whenever an MLP exists
+
+        activations = {
+            "identity": lambda x: x,
+            "logistic": expit,
+            "tanh": np.tanh,
+            "relu": lambda x: np.maximum(x, 0),
+        }
+        self.expit = expit
+        self.coefs = [np.asarray(c, dtype=np.float64) for c in model.coefs_]
+        self.intercepts = [np.asarray(b, dtype=np.float64) for b in model.intercepts_]
+        self.activation = activations[model.activation]
+        self.out_activation = model.out_activation_
+        if self.out_activation not in ("softmax", "logistic"):
+            raise ValueError(f"Unsupported MLP output activation: {self.out_activation}")
+
+    def initial(self, features):
+        return features @ self.coefs[0] + self.intercepts[0]
+
+    def update(self, parent_state, parent_features, child_features):
+        return linear_update(parent_state, parent_features, child_features, self.coefs[0])
+
+    def score(self, state, target_class, mode):
+        # MLPs have no margin score; like evaluate_batch, fall back to probabilities
+        activations = self.activation(state)
+        for coef, intercept in zip(self.coefs[1:-1], self.intercepts[1:-1]):
+            activations = self.activation(activations @ coef + intercept)
+        output = activations @ self.coefs[-1] + self.intercepts[-1]
+
+        if self.out_activation == "logistic":
+            positive = self.expit(output[:, 0])
+            return positive if target_class == 1 else 1 - positive
+        output = np.exp(output - output.max(axis=1, keepdims=True))
+        return output[:, target_class] / output.sum(axis=1)
+
+
+_incremental_models = {}
+_incremental_lock = threading.Lock()
+
+
+def get_incremental_model(model):
+    """Cached delta-aware scorer for `model`, or None if it has no incremental form."""
+    key = id(model)
+    with _incremental_lock:
+        if key not in _incremental_models:
+            scorer = None
+            name = type(model).__name__
+            try:
+                if name == "SVC":
+                    evaluator = get_svc_evaluator(model)
+                    scorer = SVCIncremental(evaluator) if evaluator is not None else None
+                elif name == "MLPClassifier":
+                    scorer = MLPIncremental(model)
+            except ValueError:
+                scorer = None
+            _incremental_models[key] = (model, scorer)  # keep model alive so its id stays unique
+        return _incremental_models[key][1]
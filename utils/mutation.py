@@ -2,16 +2,77 @@
 import numpy as np
 from config import config
 
-def mutate(image, mutation_rate):
-    mutated_image = np.copy(image)
-    # For an H×W image, total pixels = image.size
-    num_mutations = int(mutation_rate * image.size)
-
-    for _ in range(num_mutations):
-        x = np.random.randint(0, image.shape[0])
-        y = np.random.randint(0, image.shape[1])
-        # random in [-1, 1]
-        delta = np.random.randint(-1, 2)
-        mutated_image[x, y] = np.clip(mutated_image[x, y] + delta, 0, config.pixel_max)
-
-    return mutated_image
+
+def pixel_dtype(pixel_max=None):
+    """Narrowest unsigned dtype holding pixels in [0, pixel_max]: uint8 up to 255, then uint16, ..."""
+    return np.min_scalar_type(config.pixel_max if pixel_max is None else pixel_max)
+
+
+def _occurrence_rank(indices):
+    """For each entry, how many earlier entries hit the same index (0 for the first hit)."""
+    order = np.argsort(indices, kind="stable")
+    sorted_indices = indices[order]
+    positions = np.arange(indices.size)
+    is_first = np.empty(indices.size, dtype=bool)
+    is_first[:1] = True
+    is_first[1:] = sorted_indices[1:] != sorted_indices[:-1]
+    group_start = np.maximum.accumulate(np.where(is_first, positions, 0))
+
+    rank = np.empty(indices.size, dtype=np.intp)
+    rank[order] = positions - group_start
+    return rank
+
+
+def mutate_batch(images, mutation_rate, out=None, allow_repeats=True, max_delta=1, rng=None):
+    """
+    Mutate every image of an (N, H, W) stack independently, as array ops.
+
+    Each image gets int(mutation_rate * H * W) hits of a random delta in
+    [-max_delta, max_delta], clipped to [0, pixel_max]. With allow_repeats the
+    same pixel may be hit several times and each hit is clipped in turn, exactly
+    like the original per-pixel loop; otherwise the hit pixels are distinct.
+    Pass `out` to write into a preallocated (N, H, W) buffer.
+    """
+    rng = np.random if rng is None else rng
+    images = np.asarray(images)
+    n_images = images.shape[0]
+    n_pixels = images[0].size if n_images else 0
+    num_mutations = int(mutation_rate * n_pixels)
+
+    if out is None:
+        out = np.copy(images)
+    else:
+        if not out.flags.c_contiguous:
+            raise ValueError("Mutation output buffer must be C-contiguous.")
+        np.copyto(out, images)
+    if n_images == 0 or num_mutations == 0:
+        return out
+
+    if allow_repeats:
+        hits = rng.randint(0, n_pixels, size=(n_images, num_mutations))
+    else:
+        hits = np.argpartition(rng.random((n_images, n_pixels)), num_mutations - 1, axis=1)[:, :num_mutations]
+    deltas = rng.randint(-max_delta, max_delta + 1, size=(n_images, num_mutations))
+
+    # Address the whole stack as one flat pixel array
+    flat = out.reshape(-1)
+    hits = (hits + np.arange(n_images)[:, np.newaxis] * n_pixels).ravel()
+    deltas = deltas.ravel()
+
+    if allow_repeats:
+        # Apply hits in layers: layer r holds the r-th hit on each pixel, so
+        # indices are unique within a layer and clipping stays sequential.
+        rank = _occurrence_rank(hits)
+        for layer in range(rank.max() + 1):
+            in_layer = rank == layer
+            idx = hits[in_layer]
+            flat[idx] = np.clip(flat[idx] + deltas[in_layer], 0, config.pixel_max)
+    else:
+        flat[hits] = np.clip(flat[hits] + deltas, 0, config.pixel_max)
+
+    return out
+
+
+def mutate(image, mutation_rate, **kwargs):
+    return mutate_batch(np.asarray(image)[np.newaxis], mutation_rate, **kwargs)[0]
+
@@ -0,0 +1,140 @@
+# /utils/profiling.py
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+
+from config import config
+
+SYSTEM = "system"  # bucket for work not done on behalf of a particular node
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._add(f"{self.name}.seconds", time.perf_counter() - self.start)
+        self.profiler._add(f"{self.name}.calls", 1)
+        return False
+
+
+class _NodeScope:
+    __slots__ = ("local", "node_id", "previous")
+
+    def __init__(self, local, node_id):
+        self.local = local
+        self.node_id = node_id
+
+    def __enter__(self):
+        self.previous = getattr(self.local, "node_id", None)
+        self.local.node_id = self.node_id
+        return self
+
+    def __exit__(self, *exc):
+        self.local.node_id = self.previous
+        return False
+
+
+class Profiler:
+    """
+    Phase timers and counters grouped by round and node.
+
+    When disabled, phase() and node_scope() hand back a shared no-op context and
+    count() returns immediately, so instrumented code costs one call per site.
+    Work is charged to the node whose node_scope() is active on the current
+    thread, or to "system" otherwise.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.round_num = None
+        self.rounds = defaultdict(lambda: defaultdict(lambda: defaultdict(float)))
+        self.local = threading.local()
+        self.lock = threading.Lock()
+
+    def start_round(self, round_num):
+        self.round_num = round_num
+
+    def phase(self, name):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def node_scope(self, node_id):
+        if not self.enabled:
+            return _NULL_PHASE
+        return _NodeScope(self.local, node_id)
+
+    def count(self, name, amount=1):
+        if self.enabled:
+            self._add(name, amount)
+
+    def _add(self, key, value):
+        node_id = getattr(self.local, "node_id", None) or SYSTEM
+        with self.lock:
+            self.rounds[self.round_num][node_id][key] += value
+
+    def pop_node(self, round_num, node_id):
+        """Remove and return one node's stats for a round (pool workers ship these to the parent)."""
+        with self.lock:
+            return dict(self.rounds[round_num].pop(node_id, {}))
+
+    def merge(self, round_num, node_id, stats):
+        with self.lock:
+            bucket = self.rounds[round_num][node_id]
+            for key, value in stats.items():
+                bucket[key] += value
+
+    def report(self):
+        rounds = []
+        totals = defaultdict(float)
+        for round_num in sorted(self.rounds, key=lambda r: (r is None, r or 0)):
+            nodes = self.rounds[round_num]
+            round_totals = defaultdict(float)
+            for stats in nodes.values():
+                for key, value in stats.items():
+                    round_totals[key] += value
+                    totals[key] += value
+            rounds.append({
+                "round": round_num,
+                "totals": dict(round_totals),
+                "nodes": {node_id: dict(stats) for node_id, stats in sorted(nodes.items())},
+            })
+        return {"totals": dict(totals), "rounds": rounds}
+
+    def write_report(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+        print(f"⏱️ Profile written to {path}")
+
+
+_profiler = None
+
+
+def get_profiler():
+    """Process-wide profiler, enabled by config.profile."""
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler(enabled=config.profile)
+    return _profiler
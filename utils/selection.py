@@ -0,0 +1,40 @@
+# /utils/selection.py
+import numpy as np
+
+
+def plus_indices(fitness, offspring_fitness):
+    """
+    (μ+λ) survivor selection: keep the best μ of parents and offspring combined.
+    Parents come first in the pool, so an offspring only displaces a parent
+    when it is strictly better. Returns indices into the parents+offspring pool.
+    """
+    mu = fitness.shape[0]
+    pool_fitness = np.concatenate([fitness, offspring_fitness])
+    return np.argsort(-pool_fitness, kind="stable")[:mu]
+
+
+def tournament_indices(fitness, offspring_fitness, tournament_size=2, rng=None):
+    """
+    Tournament survivor selection over parents and offspring combined.
+    The best individual of the pool is always kept (elitism); the remaining
+    μ-1 slots are filled by the winners of random tournaments.
+    Returns indices into the parents+offspring pool.
+    """
+    rng = np.random if rng is None else rng
+    mu = fitness.shape[0]
+    pool_fitness = np.concatenate([fitness, offspring_fitness])
+
+    contestants = rng.randint(0, pool_fitness.shape[0], size=(mu - 1, tournament_size))
+    winners = contestants[np.arange(mu - 1), np.argmax(pool_fitness[contestants], axis=1)]
+    return np.concatenate([[np.argmax(pool_fitness)], winners])
+
+
+def survivor_indices(fitness, offspring_fitness, method="plus", tournament_size=2, rng=None):
+    """Indices of the survivors in the pool formed by parents followed by offspring."""
+    if method == "plus":
+        return plus_indices(fitness, offspring_fitness)
+    elif method == "tournament":
+        return tournament_indices(fitness, offspring_fitness, tournament_size, rng)
+    else:
+        raise ValueError(f"Unknown selection method: {method}")
+
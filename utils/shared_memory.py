@@ -0,0 +1,139 @@
+# /utils/shared_memory.py
+import pickle
+from multiprocessing import shared_memory
+
+import numpy as np
+from config import config
+
+_ALIGNMENT = 64
+
+
+def _align(offset):
+    return -(-offset // _ALIGNMENT) * _ALIGNMENT
+
+
+def _attach(name):
+    # Pool workers share the parent's resource tracker, where registrations are
+    # idempotent, so attaching here doesn't stop the owner's unlink from
+    # cleaning up.
+    return shared_memory.SharedMemory(name=name)
+
+
+class SharedModel:
+    """
+    A fitted model whose large arrays live in one shared-memory block.
+
+    The model is pickled with protocol 5 so numpy arrays (support vectors,
+    MLP weights, tree node arrays, ...) come out as separate buffers. Those are
+    copied once into shared memory next to the small pickle stream. Workers
+    unpickle against views of the block, so every process maps the same pages
+    instead of holding its own copy. The views are writable only because
+    libsvm's wrappers refuse read-only buffers; prediction never writes to them.
+    Some estimators copy on unpickle (sklearn trees rebuild their node arrays),
+    which still works but is not zero-copy.
+    """
+
+    def __init__(self, model):
+        buffers = []
+        payload = pickle.dumps(model, protocol=5, buffer_callback=buffers.append)
+        raws = [buffer.raw() for buffer in buffers]
+
+        self.layout = []
+        offset = 0
+        for raw in raws:
+            offset = _align(offset)
+            self.layout.append((offset, raw.nbytes))
+            offset += raw.nbytes
+        self.payload_offset = _align(offset)
+        self.payload_size = len(payload)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(self.payload_offset + self.payload_size, 1))
+        for (start, size), raw in zip(self.layout, raws):
+            self.shm.buf[start:start + size] = raw
+        self.shm.buf[self.payload_offset:self.payload_offset + self.payload_size] = payload
+
+    def handle(self):
+        """Picklable description a worker passes to attach_model()."""
+        return self.shm.name, self.layout, self.payload_offset, self.payload_size
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+
+def attach_model(handle):
+    """
+    Rebuild a SharedModel in this process. Returns (model, shm); keep shm
+    referenced for as long as the model is in use.
+    """
+    name, layout, payload_offset, payload_size = handle
+    shm = _attach(name)
+    buffers = [shm.buf[start:start + size] for start, size in layout]
+    model = pickle.loads(shm.buf[payload_offset:payload_offset + payload_size], buffers=buffers)
+    return model, shm
+
+
+class SolutionBoard:
+    """
+    Per-node ring buffers of published best solutions in shared memory.
+
+    Each node owns `slots` (config.buffer_size) slots. publish() writes the
+    next slot and only then bumps the node's sequence number, so a reader
+    always sees a complete solution. latest() returns a read-only view into
+    the block, so readers in other processes get a neighbor's best without it
+    being pickled.
+    """
+
+    def __init__(self, n_nodes, image_shape, dtype, slots=None, name=None):
+        self.n_nodes = n_nodes
+        self.image_shape = tuple(image_shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots or config.buffer_size
+
+        sequence_bytes = _align(n_nodes * 8)
+        fitness_bytes = _align(n_nodes * self.slots * 8)
+        solution_bytes = n_nodes * self.slots * int(np.prod(self.image_shape)) * self.dtype.itemsize
+        size = max(sequence_bytes + fitness_bytes + solution_bytes, 1)
+
+        self.owner = name is None
+        self.shm = shared_memory.SharedMemory(create=True, size=size) if self.owner else _attach(name)
+        buf = self.shm.buf
+        self.sequence = np.ndarray((n_nodes,), dtype=np.int64, buffer=buf)
+        self.fitness = np.ndarray((n_nodes, self.slots), dtype=np.float64, buffer=buf, offset=sequence_bytes)
+        self.solutions = np.ndarray(
+            (n_nodes, self.slots) + self.image_shape, dtype=self.dtype, buffer=buf,
+            offset=sequence_bytes + fitness_bytes,
+        )
+        if self.owner:
+            self.sequence[:] = 0
+
+    def handle(self):
+        return self.n_nodes, self.image_shape, self.dtype.str, self.slots, self.shm.name
+
+    @classmethod
+    def attach(cls, handle):
+        n_nodes, image_shape, dtype, slots, name = handle
+        return cls(n_nodes, image_shape, dtype, slots, name=name)
+
+    def publish(self, index, solution, fitness):
+        slot = self.sequence[index] % self.slots
+        self.solutions[index, slot] = solution
+        self.fitness[index, slot] = fitness
+        self.sequence[index] += 1
+
+    def latest(self, index):
+        """(solution view, fitness) of the node's last publication, or (None, 0.0)."""
+        sequence = int(self.sequence[index])
+        if sequence == 0:
+            return None, 0.0
+        slot = (sequence - 1) % self.slots
+        solution = self.solutions[index, slot]
+        solution.flags.writeable = False
+        return solution, float(self.fitness[index, slot])
+
+    def close(self):
+        # Drop our array views first: the block can't be closed while they export its buffer
+        del self.sequence, self.fitness, self.solutions
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
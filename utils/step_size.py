@@ -0,0 +1,139 @@
+# /utils/step_size.py
+import numpy as np
+from config import config
+from utils.profiling import get_profiler
+
+
+class FixedStepSize:
+    """
+    Mutation strength of one node: the mutation rate and the largest pixel
+    delta of its mutants. Both are config.mutation_rate and
+    config.mutation_max_delta scaled by one factor, sigma, and kept within
+    their useful range: at least one hit per mutant (unless mutation_rate
+    asks for fewer), at most max(mutation_rate, 1) of the pixels, and deltas
+    in [1, pixel_max].
+
+    This base controller never changes sigma. Subclasses adapt it from the
+    outcome of each generation (see update()).
+    """
+
+    def __init__(self, n_pixels, pixel_max):
+        self.base_rate = config.mutation_rate
+        self.base_delta = config.mutation_max_delta
+        self.min_rate = min(1.0 / n_pixels, self.base_rate)
+        self.max_rate = max(self.base_rate, 1.0)
+        self.pixel_max = pixel_max
+        # Beyond these sigmas neither the rate nor the delta would change any more
+        self.min_sigma = min(self.min_rate / self.base_rate, 1.0)
+        self.max_sigma = max(self.max_rate / self.base_rate, pixel_max / self.base_delta, 1.0)
+
+        self.sigma = 1.0
+        self.stagnation = 0  # generations since the population's best last improved
+        self.restarts = 0
+
+    @property
+    def rate(self):
+        return float(np.clip(self.base_rate * self.sigma, self.min_rate, self.max_rate))
+
+    @property
+    def max_delta(self):
+        return int(np.clip(round(self.base_delta * self.sigma), 1, self.pixel_max))
+
+    def update(self, success_fraction, improved):
+        """
+        Called once per generation with the fraction of offspring that beat the
+        population's best before selection, and whether the best improved.
+        """
+        self.stagnation = 0 if improved else self.stagnation + 1
+
+    def get_state(self):
+        return {"sigma": self.sigma, "stagnation": self.stagnation, "restarts": self.restarts}
+
+    def set_state(self, state):
+        for key, value in state.items():
+            setattr(self, key, value)
+
+    def _scale(self, factor):
+        self.sigma = float(np.clip(self.sigma * factor, self.min_sigma, self.max_sigma))
+
+    def _restart_if_stagnant(self):
+        """Stagnation-triggered restart: back to the configured strength after step_size_restart idle generations."""
+        if config.step_size_restart and self.stagnation >= config.step_size_restart:
+            self.sigma = 1.0
+            self.stagnation = 0
+            self.restarts += 1
+            get_profiler().count("step_size_restarts")
+            return True
+        return False
+
+
+class OneFifthStepSize(FixedStepSize):
+    """
+    Rechenberg's 1/5th success rule: every step_size_window generations, widen
+    the mutations by step_size_factor if more than a fifth of the offspring
+    improved on the best, narrow them if fewer did.
+    """
+
+    def __init__(self, n_pixels, pixel_max):
+        super().__init__(n_pixels, pixel_max)
+        self.successes = 0.0
+        self.trials = 0
+
+    def update(self, success_fraction, improved):
+        super().update(success_fraction, improved)
+        self.successes += success_fraction
+        self.trials += 1
+        if self.trials >= config.step_size_window:
+            rate = self.successes / self.trials
+            if rate > 0.2:
+                self._scale(config.step_size_factor)
+            elif rate < 0.2:
+                self._scale(1.0 / config.step_size_factor)
+            self.successes, self.trials = 0.0, 0
+        if self._restart_if_stagnant():
+            self.successes, self.trials = 0.0, 0
+
+    def get_state(self):
+        return dict(super().get_state(), successes=self.successes, trials=self.trials)
+
+
+class SuccessRuleStepSize(FixedStepSize):
+    """
+    The smoothed success rule of the (1+λ)-CMA-ES: the success probability is
+    an exponential average over generations and sigma moves every generation,
+    up when it is above the target rate and down when below, damped by
+    step_size_damping.
+    """
+
+    def __init__(self, n_pixels, pixel_max):
+        super().__init__(n_pixels, pixel_max)
+        offspring = config.offspring_size
+        self.target_success = 1.0 / (5.0 + np.sqrt(offspring) / 2.0)
+        self.smoothing = self.target_success * offspring / (2.0 + self.target_success * offspring)
+        self.success = self.target_success
+
+    def update(self, success_fraction, improved):
+        super().update(success_fraction, improved)
+        self.success += self.smoothing * (success_fraction - self.success)
+        self._scale(np.exp(
+            (self.success - self.target_success) / (config.step_size_damping * (1.0 - self.target_success))
+        ))
+        if self._restart_if_stagnant():
+            self.success = self.target_success
+
+    def get_state(self):
+        return dict(super().get_state(), success=self.success)
+
+
+STEP_SIZE_CONTROLLERS = {
+    "fixed": FixedStepSize,
+    "one_fifth": OneFifthStepSize,
+    "success_rule": SuccessRuleStepSize,
+}
+
+
+def make_step_size(n_pixels, pixel_max, kind=None):
+    kind = kind or config.step_size_control
+    if kind not in STEP_SIZE_CONTROLLERS:
+        raise ValueError(f"Unknown step size control: {kind}")
+    return STEP_SIZE_CONTROLLERS[kind](n_pixels, pixel_max)
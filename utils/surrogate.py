@@ -0,0 +1,148 @@
+# /utils/surrogate.py
+import threading
+
+import numpy as np
+from config import config
+from utils.profiling import get_profiler
+
+_EPS = 1e-6
+
+
+def logit(confidence):
+    """Log-odds of a confidence, clipped away from 0 and 1 so it stays finite."""
+    confidence = np.clip(confidence, _EPS, 1 - _EPS)
+    return np.log(confidence / (1 - confidence))
+
+
+_COUNTERS = ("screened", "evaluated", "audits", "audit_hits", "abs_error_sum", "abs_error_count")
+
+
+class LinearSurrogate:
+    """
+    Cheap online stand-in for the classifier, used to rank mutants before the
+    real model sees them.
+
+    A ridge regression from scaled pixels to the logit of the target-class
+    confidence, fitted from the (image, confidence) pairs the nodes already
+    compute. Sufficient statistics are accumulated as they arrive and the
+    weights are re-solved every `refit_interval` new samples.
+    """
+
+    def __init__(self, n_features, ridge=None, refit_interval=None, warmup=None):
+        self.n_features = n_features
+        self.ridge = ridge if ridge is not None else config.surrogate_ridge
+        self.refit_interval = refit_interval or config.surrogate_refit_interval
+        self.warmup = warmup if warmup is not None else config.surrogate_warmup
+        self.gram = np.zeros((n_features + 1, n_features + 1))
+        self.moment = np.zeros(n_features + 1)
+        self.weights = None
+        self.samples = 0
+        self.pending = 0
+        self.lock = threading.Lock()
+
+        # Accuracy and savings statistics
+        self.screened = 0
+        self.evaluated = 0
+        self.audits = 0
+        self.audit_hits = 0
+        self.abs_error_sum = 0.0
+        self.abs_error_count = 0
+
+    def _design(self, images):
+        images = np.asarray(images)
+        X = np.empty((images.shape[0], self.n_features + 1))
+        X[:, :-1] = images.reshape(images.shape[0], -1)
+        X[:, :-1] /= config.pixel_max
+        X[:, -1] = 1.0
+        return X
+
+    def ready(self):
+        return self.weights is not None and self.samples >= self.warmup
+
+    def update(self, images, confidences):
+        X = self._design(images)
+        y = logit(np.asarray(confidences, dtype=float))
+        with self.lock:
+            self.gram += X.T @ X
+            self.moment += X.T @ y
+            self.samples += X.shape[0]
+            self.pending += X.shape[0]
+            if self.pending >= self.refit_interval:
+                self._refit()
+
+    def _refit(self):
+        regularized = self.gram + self.ridge * np.eye(self.gram.shape[0])
+        self.weights = np.linalg.solve(regularized, self.moment)
+        self.pending = 0
+
+    def predict(self, images):
+        """Predicted confidence for each image."""
+        logits = self._design(images) @ self.weights
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    def select(self, images, k):
+        """Indices of the k images the surrogate ranks highest."""
+        predicted = self.predict(images)
+        if k >= len(predicted):
+            return np.arange(len(predicted)), predicted
+        return np.argpartition(-predicted, k - 1)[:k], predicted
+
+    def record(self, screened, evaluated, predicted=None, actual=None, chosen=None):
+        """
+        Track savings, and accuracy where true scores are known. On audit
+        generations the whole pool is scored, so we also check whether the
+        surrogate's top-k contained the real best mutant.
+        """
+        with self.lock:
+            self.screened += screened
+            self.evaluated += evaluated
+            if predicted is not None:
+                self.abs_error_sum += float(np.abs(predicted - actual).sum())
+                self.abs_error_count += len(actual)
+            if chosen is not None:
+                self.audits += 1
+                self.audit_hits += int(np.argmax(actual) in set(chosen.tolist()))
+        profiler = get_profiler()
+        profiler.count("surrogate_screened", screened)
+        profiler.count("surrogate_model_images_saved", screened - evaluated)
+
+    def pop_counters(self):
+        """Return and reset the savings and accuracy counters (pool workers ship these to the parent)."""
+        with self.lock:
+            counters = {name: getattr(self, name) for name in _COUNTERS}
+            for name, value in counters.items():
+                setattr(self, name, type(value)())
+        return counters
+
+    def merge_counters(self, counters):
+        with self.lock:
+            for name, value in counters.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def stats(self):
+        return {
+            "samples": self.samples,
+            "screened": self.screened,
+            "evaluated": self.evaluated,
+            "model_images_saved": self.screened - self.evaluated,
+            "mean_abs_error": self.abs_error_sum / self.abs_error_count if self.abs_error_count else None,
+            "topk_recall": self.audit_hits / self.audits if self.audits else None,
+        }
+
+
+_surrogates = {}
+_surrogates_lock = threading.Lock()
+
+
+def get_surrogate(model, target_class, n_features):
+    """One surrogate per (model, target) per process, shared by every node that attacks it."""
+    key = (id(model), int(target_class))
+    with _surrogates_lock:
+        if key not in _surrogates:
+            _surrogates[key] = LinearSurrogate(n_features)
+        return _surrogates[key]
+
+
+def all_surrogates():
+    with _surrogates_lock:
+        return list(_surrogates.values())
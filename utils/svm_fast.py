@@ -0,0 +1,171 @@
+# /utils/svm_fast.py
+import threading
+
+import numpy as np
+
+# libsvm clamps pairwise probabilities to [MIN_PROB, 1 - MIN_PROB]
+MIN_PROB = 1e-7
+
+
+class SVCEvaluator:
+    """
+    Vectorized scoring for a fitted multi-class sklearn SVC.
+
+    Support vectors and a (n_SV, n_pairs) one-vs-one coefficient matrix are
+    precomputed once, so a batch of candidates costs one kernel block and one
+    matrix product. Probabilities follow libsvm exactly: Platt-scaled pairwise
+    probabilities combined by the same iterative pairwise coupling.
+    """
+
+    def __init__(self, model):
+        if model.kernel not in ("rbf", "linear", "poly", "sigmoid"):
+            raise ValueError(f"Unsupported SVC kernel for the fast path: {model.kernel}")
+
+        self.kernel = model.kernel
+        self.gamma = model._gamma
+        self.degree = model.degree
+        self.coef0 = model.coef0
+        self.support_vectors = np.asarray(model.support_vectors_, dtype=np.float64)
+        self.sv_sq_norms = np.einsum("ij,ij->i", self.support_vectors, self.support_vectors)
+
+        n_support = np.asarray(model.n_support_)
+        self.n_classes = len(n_support)
+        if self.n_classes < 3:
+            raise ValueError("The SVC fast path expects a multi-class model.")
+        starts = np.concatenate([[0], np.cumsum(n_support)])
+
+        # Pairs in libsvm order; column p holds every SV's coefficient in classifier p
+        self.pairs = [(i, j) for i in range(self.n_classes) for j in range(i + 1, self.n_classes)]
+        self.pair_index = tuple(np.array(self.pairs).T)
+        self.coefficients = np.zeros((self.support_vectors.shape[0], len(self.pairs)))
+        for p, (i, j) in enumerate(self.pairs):
+            self.coefficients[starts[i]:starts[i + 1], p] = model.dual_coef_[j - 1, starts[i]:starts[i + 1]]
+            self.coefficients[starts[j]:starts[j + 1], p] = model.dual_coef_[i, starts[j]:starts[j + 1]]
+        self.intercept = np.asarray(model.intercept_, dtype=np.float64)
+
+        self.has_probability = getattr(model, "probability", False) and len(getattr(model, "probA_", [])) > 0
+        if self.has_probability:
+            self.prob_a = np.asarray(model.probA_, dtype=np.float64)
+            self.prob_b = np.asarray(model.probB_, dtype=np.float64)
+
+        self._margin_cache = {}
+
+    def kernel_inputs(self, X):
+        """
+        The per-support-vector quantity the kernel is a function of: squared
+        distances for RBF, dot products otherwise. Shape (N, n_SV).
+        """
+        dot = X @ self.support_vectors.T
+        if self.kernel != "rbf":
+            return dot
+        return np.einsum("ij,ij->i", X, X)[:, np.newaxis] + self.sv_sq_norms - 2 * dot
+
+    def kernel_from_inputs(self, inputs):
+        if self.kernel == "linear":
+            return inputs
+        if self.kernel == "poly":
+            return (self.gamma * inputs + self.coef0) ** self.degree
+        if self.kernel == "sigmoid":
+            return np.tanh(self.gamma * inputs + self.coef0)
+        return np.exp(-self.gamma * np.maximum(inputs, 0))
+
+    def kernel_rows(self, X):
+        return self.kernel_from_inputs(self.kernel_inputs(X))
+
+    def decision_function(self, X):
+        """One-vs-one decision values, (N, n_pairs); positive favours the first class of the pair."""
+        return self.decision_from_kernel(self.kernel_rows(X))
+
+    def decision_from_kernel(self, kernel):
+        return kernel @ self.coefficients + self.intercept
+
+    def _pairwise_probabilities(self, decision):
+        # libsvm sigmoid_predict: 1 / (1 + exp(A*f + B)), in a numerically stable form
+        fApB = decision * self.prob_a + self.prob_b
+        positive = fApB >= 0
+        prob = np.empty_like(fApB)
+        prob[positive] = np.exp(-fApB[positive]) / (1 + np.exp(-fApB[positive]))
+        prob[~positive] = 1 / (1 + np.exp(fApB[~positive]))
+        prob = np.clip(prob, MIN_PROB, 1 - MIN_PROB)
+
+        r = np.zeros((decision.shape[0], self.n_classes, self.n_classes))
+        first, second = self.pair_index
+        r[:, first, second] = prob
+        r[:, second, first] = 1 - prob
+        return r
+
+    def _couple(self, r):
+        """libsvm's multiclass_probability (Wu, Lin & Weng, method 2), run for the whole batch at once."""
+        n, k = r.shape[0], self.n_classes
+        # Q[t][t] = sum_{j != t} r[j][t]^2, Q[t][j] = -r[j][t] * r[t][j]
+        rt = np.swapaxes(r, 1, 2)
+        Q = -rt * r
+        idx = np.arange(k)
+        Q[:, idx, idx] = (rt ** 2).sum(axis=2) - (rt[:, idx, idx] ** 2)
+
+        p = np.full((n, k), 1.0 / k)
+        eps = 0.005 / k
+        active = np.ones(n, dtype=bool)
+        for _ in range(max(100, k)):
+            Qp = np.einsum("ntj,nj->nt", Q, p)
+            pQp = np.einsum("nt,nt->n", p, Qp)
+            active &= np.abs(Qp - pQp[:, np.newaxis]).max(axis=1) >= eps
+            if not active.any():
+                break
+            rows = np.flatnonzero(active)
+            pa, Qpa, pQpa, Qa = p[rows], Qp[rows], pQp[rows], Q[rows]
+            for t in range(k):
+                diff = (-Qpa[:, t] + pQpa) / Qa[:, t, t]
+                pa[:, t] += diff
+                pQpa = (pQpa + diff * (diff * Qa[:, t, t] + 2 * Qpa[:, t])) / (1 + diff) / (1 + diff)
+                Qpa = (Qpa + diff[:, np.newaxis] * Qa[:, t, :]) / (1 + diff)[:, np.newaxis]
+                pa /= (1 + diff)[:, np.newaxis]
+            p[rows] = pa
+        return p
+
+    def predict_proba(self, X):
+        return self.proba_from_kernel(self.kernel_rows(X))
+
+    def proba_from_kernel(self, kernel):
+        if not self.has_probability:
+            raise ValueError("SVC was not fitted with probability=True.")
+        return self._couple(self._pairwise_probabilities(self.decision_from_kernel(kernel)))
+
+    def target_margin(self, X, target_class):
+        """
+        Squashed worst-case one-vs-one margin of the target class: sigmoid of the
+        smallest decision value among the target's pairs, signed towards the target.
+        Only the target's n_classes-1 classifiers are evaluated, and no Platt scaling
+        or coupling is needed. Monotone in how decisively the target wins.
+        """
+        return self.margin_from_kernel(self.kernel_rows(X), target_class)
+
+    def margin_from_kernel(self, kernel, target_class):
+        if target_class not in self._margin_cache:
+            columns = [p for p, pair in enumerate(self.pairs) if target_class in pair]
+            signs = np.array([1.0 if self.pairs[p][0] == target_class else -1.0 for p in columns])
+            self._margin_cache[target_class] = (
+                self.coefficients[:, columns] * signs, self.intercept[columns] * signs
+            )
+        coefficients, intercept = self._margin_cache[target_class]
+        margins = (kernel @ coefficients + intercept).min(axis=1)
+        return 1 / (1 + np.exp(-margins))
+
+
+_evaluators = {}
+_evaluators_lock = threading.Lock()
+
+
+def get_svc_evaluator(model):
+    """Cached SVCEvaluator for `model`, or None if the model isn't a supported SVC."""
+    key = id(model)
+    with _evaluators_lock:
+        if key not in _evaluators:
+            evaluator = None
+            if type(model).__name__ == "SVC":
+                try:
+                    evaluator = SVCEvaluator(model)
+                except ValueError:
+                    evaluator = None
+            _evaluators[key] = (model, evaluator)  # keep model alive so its id stays unique
+        return _evaluators[key][1]
@@ -1,7 +1,7 @@
 # /utils/visualization.py
-import matplotlib.pyplot as plt
 
 def visualize_image(image, title):
+    import matplotlib.pyplot as plt
     plt.imshow(image, cmap='gray')
     plt.title(title)
     plt.show()